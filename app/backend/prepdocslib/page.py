@@ -1,5 +1,5 @@
 import base64
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Any, Optional
 
 
@@ -27,10 +27,9 @@ class ImageOnPage:
         *,
         include_bytes_base64: bool = True,
     ) -> dict[str, Any]:
-        data = asdict(self)
-
-        # Remove raw bytes to keep payload lean (and JSON-friendly without extra handling).
-        data.pop("bytes", None)
+        # Leave out raw bytes to keep payload lean (and JSON-friendly without extra handling).
+        # A shallow field copy also avoids asdict() deep-copying the image bytes only to drop them.
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "bytes"}
 
         # Optionally include base64-encoded bytes for skills that need it
         if include_bytes_base64:
@@ -331,6 +331,7 @@ async def run_evaluation(
         # Emit per-question telemetry
         emit_eval_question_result(
             run_id=run_id,
+            question_index=i,
             question=question,
             truth=truth,
             answer=answer,
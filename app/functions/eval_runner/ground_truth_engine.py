@@ -6,6 +6,7 @@ Fetches document chunks from Azure AI Search, builds a RAGAS knowledge graph,
 generates Q&A pairs, and stores results in blob storage.
 """
 
+import functools
 import json
 import logging
 import os
@@ -19,15 +20,10 @@ import types
 if "__main__" not in sys.modules:
     sys.modules["__main__"] = types.ModuleType("__main__")
 
-# Allow RAGAS to use asyncio inside the Azure Functions worker event loop.
-# Without this, RAGAS's internal asyncio.run() calls would fail with
-# "Cannot run the event loop while another one is running".
 import nest_asyncio
-
-nest_asyncio.apply()
-
-from azure.search.documents import SearchClient
-from azure.storage.blob import BlobServiceClient
+from azure.search.documents.aio import SearchClient
+from azure.storage.blob.aio import BlobServiceClient
+from kg_archive import pack_knowledge_graph
 from langchain_core.documents import Document as LCDocument
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from ragas.embeddings import LangchainEmbeddingsWrapper
@@ -38,43 +34,70 @@ from ragas.testset.transforms import apply_transforms, default_transforms
 
 logger = logging.getLogger("eval_runner.ground_truth")
 
+# Matches the [[citation]] prefix that each knowledge graph node's page_content starts with
+CITATION_REGEX = re.compile(r"\[\[([^\]]*?)\]\]")
 
-def _get_search_documents(
+
+async def _get_search_documents(
     search_service: str,
     search_index: str,
     credential,
     num_search_documents: int | None = None,
 ) -> list[dict]:
-    """Fetch all document chunks from Azure AI Search (sync SDK)."""
-    search_client = SearchClient(
-        endpoint=f"https://{search_service}.search.windows.net",
-        index_name=search_index,
-        credential=credential,
-    )
+    """Fetch all document chunks from Azure AI Search."""
     all_documents = []
     top = num_search_documents or 100000
     logger.info("Fetching up to %d document chunks from index '%s'", top, search_index)
-    response = search_client.search(search_text="*", top=top).by_page()
-    for page in response:
-        all_documents.extend(list(page))
+    async with SearchClient(
+        endpoint=f"https://{search_service}.search.windows.net",
+        index_name=search_index,
+        credential=credential,
+    ) as search_client:
+        response = await search_client.search(search_text="*", top=top)
+        async for page in response.by_page():
+            all_documents.extend([doc async for doc in page])
     logger.info("Fetched %d document chunks", len(all_documents))
     return all_documents
 
 
-def _build_openai_components(credential, azure_endpoint: str):
-    """Build LangChain-wrapped LLM and embeddings for RAGAS."""
-    from azure.identity import get_bearer_token_provider
+# Shared across invocations: the credential passed in is the process-wide singleton from settings
+_token_provider = None
+
 
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-06-01")
-    token_provider = get_bearer_token_provider(credential, "https://cognitiveservices.azure.com/.default")
+def _get_token_provider(credential):
+    global _token_provider
+    if _token_provider is None:
+        from azure.identity import get_bearer_token_provider
+
+        _token_provider = get_bearer_token_provider(credential, "https://cognitiveservices.azure.com/.default")
+    return _token_provider
+
+
+@functools.lru_cache(maxsize=4)
+def _build_openai_components_cached(
+    token_provider,
+    azure_endpoint: str,
+    api_version: str,
+    chat_deployment: str,
+    chat_model: str,
+    emb_deployment: str,
+    emb_model: str,
+):
+    """
+    Build LangChain-wrapped LLM and embeddings for RAGAS.
 
+    Cached so repeated /generate invocations reuse the same underlying HTTP clients
+    (and their connection pools) instead of re-negotiating TLS on every run. The
+    token provider is passed in (and so is part of the cache key) rather than read
+    from module state, so a cached entry is always built with a real provider.
+    """
     llm = LangchainLLMWrapper(
         AzureChatOpenAI(
             openai_api_version=api_version,
             azure_endpoint=azure_endpoint,
             azure_ad_token_provider=token_provider,
-            azure_deployment=os.getenv("AZURE_OPENAI_EVAL_DEPLOYMENT", "eval"),
-            model=os.environ.get("AZURE_OPENAI_EVAL_MODEL", "gpt-4o"),
+            azure_deployment=chat_deployment,
+            model=chat_model,
             validate_base_url=False,
         )
     )
@@ -83,13 +106,26 @@ def _build_openai_components(credential, azure_endpoint: str):
             openai_api_version=api_version,
             azure_endpoint=azure_endpoint,
             azure_ad_token_provider=token_provider,
-            azure_deployment=os.getenv("AZURE_OPENAI_EMB_DEPLOYMENT", "text-embedding-3-large"),
-            model=os.environ.get("AZURE_OPENAI_EMB_MODEL_NAME", "text-embedding-3-large"),
+            azure_deployment=emb_deployment,
+            model=emb_model,
         )
     )
     return llm, embeddings
 
 
+def _build_openai_components(credential, azure_endpoint: str):
+    """Return the (cached) LangChain-wrapped LLM and embeddings for the current settings."""
+    return _build_openai_components_cached(
+        _get_token_provider(credential),
+        azure_endpoint,
+        os.getenv("AZURE_OPENAI_API_VERSION", "2024-06-01"),
+        os.getenv("AZURE_OPENAI_EVAL_DEPLOYMENT", "eval"),
+        os.environ.get("AZURE_OPENAI_EVAL_MODEL", "gpt-4o"),
+        os.getenv("AZURE_OPENAI_EMB_DEPLOYMENT", "text-embedding-3-large"),
+        os.environ.get("AZURE_OPENAI_EMB_MODEL_NAME", "text-embedding-3-large"),
+    )
+
+
 async def generate_ground_truth(
     credential,
     sync_credential,
@@ -101,10 +137,17 @@ async def generate_ground_truth(
 
     Uses nest_asyncio to allow RAGAS's internal asyncio calls to run inside
     the Azure Functions worker event loop. All work stays on the main thread
-    so Flex Consumption correctly tracks the invocation as active.
+    so Flex Consumption correctly tracks the invocation as active; Search and
+    Blob I/O use the async SDKs so they don't block other invocations.
 
     Returns the number of Q&A pairs generated.
     """
+    # Allow RAGAS to use asyncio inside the Azure Functions worker event loop.
+    # Without this, RAGAS's internal asyncio.run() calls would fail with
+    # "Cannot run the event loop while another one is running". Applied here rather
+    # than at import time so the module can be warmed up from a background thread.
+    nest_asyncio.apply()
+
     storage_account = os.environ["AZURE_STORAGE_ACCOUNT"]
     container_name = os.getenv("EVAL_BLOB_CONTAINER", "eval-data")
     search_service = os.environ["AZURE_SEARCH_SERVICE"]
@@ -119,8 +162,8 @@ async def generate_ground_truth(
     else:
         azure_endpoint = f"https://{os.getenv('AZURE_OPENAI_SERVICE')}.openai.azure.com"
 
-    # Fetch documents from search (sync SDK)
-    search_docs = _get_search_documents(search_service, search_index, sync_credential, num_search_documents)
+    # Fetch documents from search
+    search_docs = await _get_search_documents(search_service, search_index, credential, num_search_documents)
     if not search_docs:
         logger.warning("No documents found in search index '%s'", search_index)
         return 0
@@ -196,41 +239,43 @@ async def generate_ground_truth(
         truth = sample.eval_sample.reference
         citations = []
         for context in sample.eval_sample.reference_contexts:
-            match = re.search(r"\[\[(.*?)\]\]", context)
+            match = CITATION_REGEX.search(context)
             if match:
                 citations.append(f"[{match.group(1)}]")
-        truth += " " + " ".join(citations)
+        if citations:
+            truth = f"{truth} {' '.join(citations)}"
         qa_pairs.append({"question": question, "truth": truth})
 
     logger.info("Extracted %d Q&A pairs", len(qa_pairs))
 
-    # Store in blob storage (sync SDK to stay on main thread)
-    blob_service_url = f"https://{storage_account}.blob.core.windows.net"
-    blob_service = BlobServiceClient(blob_service_url, credential=sync_credential)
-    container_client = blob_service.get_container_client(container_name)
-
-    try:
-        container_client.create_container()
-    except Exception:
-        pass  # Container already exists
-
-    # Upload ground truth JSONL
-    gt_content = "\n".join(json.dumps(pair) for pair in qa_pairs) + "\n"
-    gt_blob = container_client.get_blob_client("ground-truth/ground_truth.jsonl")
-    gt_blob.upload_blob(gt_content, overwrite=True)
-
-    # Upload knowledge graph
+    # Pack the knowledge graph with float32 embeddings (several times smaller than the JSON)
     with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as tmp:
         tmp_path = tmp.name
     try:
         kg.save(tmp_path)
         with open(tmp_path, "rb") as f:
-            kg_data = f.read()
-        kg_blob = container_client.get_blob_client("ground-truth/ground_truth_kg.json")
-        kg_blob.upload_blob(kg_data, overwrite=True)
+            kg_data = pack_knowledge_graph(f.read())
     finally:
         os.unlink(tmp_path)
 
-    blob_service.close()
+    # Store in blob storage
+    blob_service_url = f"https://{storage_account}.blob.core.windows.net"
+    async with BlobServiceClient(blob_service_url, credential=credential) as blob_service:
+        container_client = blob_service.get_container_client(container_name)
+
+        try:
+            await container_client.create_container()
+        except Exception:
+            pass  # Container already exists
+
+        # Upload ground truth JSONL
+        gt_content = "\n".join(json.dumps(pair) for pair in qa_pairs) + "\n"
+        gt_blob = container_client.get_blob_client("ground-truth/ground_truth.jsonl")
+        await gt_blob.upload_blob(gt_content, overwrite=True)
+
+        # Upload knowledge graph
+        kg_blob = container_client.get_blob_client("ground-truth/ground_truth_kg.npz")
+        await kg_blob.upload_blob(kg_data, overwrite=True)
+
     logger.info("Stored %d Q&A pairs in blob storage", len(qa_pairs))
     return len(qa_pairs)
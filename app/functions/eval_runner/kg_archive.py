@@ -0,0 +1,64 @@
+"""
+Compact storage format for RAGAS knowledge graphs.
+
+KnowledgeGraph.save writes indented JSON with every embedding float as text.
+These helpers repack that JSON into a compressed .npz archive (and back) using
+only numpy and orjson, so they can be used and tested without importing RAGAS.
+"""
+
+import io
+
+import numpy as np
+import orjson
+
+# Archive entry holding the orjson-encoded graph (everything except the embeddings)
+GRAPH_ARRAY = "graph"
+# Suffix of the archive entry that lists, for each embedding matrix, the node each row belongs to
+NODES_SUFFIX = "__nodes"
+
+
+def pack_knowledge_graph(kg_json: bytes) -> bytes:
+    """
+    Repack a saved RAGAS knowledge graph into a compressed .npz archive.
+
+    Node embedding properties are moved out of the JSON into one float32 matrix per
+    property name (stored as "<property>" arrays, with the owning node positions in
+    "<property>__nodes"), and each node's property is replaced by its row index.
+    Embedding properties that are not non-empty lists (e.g. None) are left in the JSON.
+    The remaining graph is stored as orjson bytes in the "graph" array.
+    """
+    data = orjson.loads(kg_json)
+    embeddings: dict[str, list[list[float]]] = {}
+    owners: dict[str, list[int]] = {}
+    for node_index, node in enumerate(data["nodes"]):
+        properties = node["properties"]
+        for key, value in properties.items():
+            if key.endswith("embedding") and isinstance(value, list) and value:
+                rows = embeddings.setdefault(key, [])
+                properties[key] = len(rows)
+                rows.append(value)
+                owners.setdefault(key, []).append(node_index)
+
+    arrays = {GRAPH_ARRAY: np.frombuffer(orjson.dumps(data), dtype=np.uint8)}
+    for key, rows in embeddings.items():
+        arrays[key] = np.asarray(rows, dtype=np.float32)
+        arrays[key + NODES_SUFFIX] = np.asarray(owners[key], dtype=np.int64)
+
+    buf = io.BytesIO()
+    np.savez_compressed(buf, allow_pickle=False, **arrays)
+    return buf.getvalue()
+
+
+def unpack_knowledge_graph(kg_npz: bytes) -> dict:
+    """Inverse of pack_knowledge_graph: returns the dict that KnowledgeGraph.save writes as JSON."""
+    with np.load(io.BytesIO(kg_npz)) as archive:
+        data = orjson.loads(archive[GRAPH_ARRAY].tobytes())
+        keys = [key for key in archive.files if key != GRAPH_ARRAY and not key.endswith(NODES_SUFFIX)]
+        embeddings = {key: (archive[key], archive[key + NODES_SUFFIX]) for key in keys}
+
+    nodes = data["nodes"]
+    # Only the properties that pack replaced are restored; anything else is kept as written
+    for key, (rows, node_indexes) in embeddings.items():
+        for row, node_index in zip(rows.tolist(), node_indexes.tolist()):
+            nodes[node_index]["properties"][key] = row
+    return data
@@ -2,11 +2,18 @@
 Telemetry helper for emitting custom events to Application Insights.
 
 Uses the OpenCensus Azure Monitor exporter to send custom events
-directly to the App Insights customEvents table.
+directly to the App Insights customEvents table. Events are handed to the
+exporter on a background thread so emitting them never blocks the caller.
 """
 
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 from opencensus.ext.azure.log_exporter import AzureEventHandler
 
@@ -16,15 +23,119 @@ logger = logging.getLogger("eval_runner.telemetry")
 _event_logger = logging.getLogger("eval_runner.events")
 _event_logger.setLevel(logging.INFO)
 
+
+def _start_event_listener(handler: logging.Handler) -> QueueListener:
+    """
+    Route custom events to handler through a background listener thread.
+
+    Callers only pay for an enqueue; the listener thread owns the handler's lock. The
+    listener is stopped at exit, which first hands it every record still queued.
+    """
+    listener = QueueListener(queue.SimpleQueue(), handler)
+    _event_logger.addHandler(QueueHandler(listener.queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 _conn_str = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "")
 if _conn_str:
-    _handler = AzureEventHandler(connection_string=_conn_str)
-    _event_logger.addHandler(_handler)
+    _listener = _start_event_listener(AzureEventHandler(connection_string=_conn_str))
     logger.info("App Insights event handler configured")
 else:
     logger.warning("APPLICATIONINSIGHTS_CONNECTION_STRING not set — events will not be sent")
 
 
+class EventBatcher:
+    """
+    Buffers records and emits them as a single custom event.
+
+    A batch is flushed once it holds max_records records, once max_interval_seconds
+    have passed since the last flush, or before it would grow past max_chars of
+    serialized JSON (App Insights truncates custom dimension values at 8192 chars).
+    Records are meant to be small; one whose encoding alone would not fit has its
+    longest string fields (by encoded length) trimmed until it does.
+    """
+
+    def __init__(
+        self,
+        event_name: str,
+        *,
+        max_records: int = 50,
+        max_interval_seconds: float = 5.0,
+        max_chars: int = 8000,
+    ):
+        self.event_name = event_name
+        self.max_records = max_records
+        self.max_interval_seconds = max_interval_seconds
+        self.max_chars = max_chars
+        self._records: list[str] = []
+        self._chars = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, record: dict):
+        # -2 for the brackets of the JSON array it is emitted in
+        encoded = self._encode(record, self.max_chars - 2)
+        with self._lock:
+            # +1 for the separating comma in the JSON array
+            if self._records and self._chars + len(encoded) + 1 > self.max_chars:
+                self._emit(self._drain())
+            self._records.append(encoded)
+            self._chars += len(encoded) + 1
+            if (
+                len(self._records) >= self.max_records
+                or time.monotonic() - self._last_flush >= self.max_interval_seconds
+            ):
+                self._emit(self._drain())
+
+    @staticmethod
+    def _encode(record: dict, max_chars: int) -> str:
+        encoded = json.dumps(record, ensure_ascii=False)
+        while len(encoded) > max_chars:
+            # Escaped characters encode to up to 6 chars each, so fields are compared by encoded length
+            encoded_lengths = {
+                key: len(json.dumps(value, ensure_ascii=False)) - 2  # without the quotes
+                for key, value in record.items()
+                if isinstance(value, str) and value
+            }
+            if not encoded_lengths:
+                logger.warning("Record is %d chars after encoding, over the %d-char limit", len(encoded), max_chars)
+                break
+            longest = max(encoded_lengths, key=encoded_lengths.__getitem__)
+            value, value_chars = record[longest], encoded_lengths[longest]
+            # Keep the share of the field that fits, as if its escapes were spread evenly;
+            # the result is always shorter than the field, so the loop ends
+            keep = len(value) * max(0, value_chars - (len(encoded) - max_chars)) // value_chars
+            record = {**record, longest: value[:keep]}
+            encoded = json.dumps(record, ensure_ascii=False)
+        return encoded
+
+    def flush(self):
+        with self._lock:
+            self._emit(self._drain())
+
+    def _drain(self) -> list[str]:
+        records, self._records, self._chars = self._records, [], 0
+        self._last_flush = time.monotonic()
+        return records
+
+    def _emit(self, records: list[str]):
+        if not records:
+            return
+        props = {
+            "custom_dimensions": {
+                "num_records": len(records),
+                "records": f"[{','.join(records)}]",
+            }
+        }
+        _event_logger.info(self.event_name, extra=props)
+        logger.info("Emitted %s event with %d records", self.event_name, len(records))
+
+
+_question_result_batcher = EventBatcher("EvalQuestionResultBatch")
+
+
 def emit_operation_started(
     *,
     operation: str,
@@ -101,6 +212,7 @@ def emit_eval_run_completed(
 def emit_eval_question_result(
     *,
     run_id: str,
+    question_index: int,
     question: str,
     truth: str = "",
     answer: str = "",
@@ -113,22 +225,42 @@ def emit_eval_question_result(
     latency: float,
     answer_length: int,
 ):
-    """Emit an EvalQuestionResult custom event to App Insights."""
+    """
+    Emit a per-question result to App Insights.
+
+    The question, expected answer, answer and context are sent right away as an
+    EvalQuestionResult event. The scores are queued and sent in EvalQuestionResultBatch
+    events, which hold many questions each; call flush_eval_question_results() once the
+    run has finished. question_index links the two.
+    """
     props = {
         "custom_dimensions": {
             "run_id": run_id,
+            "question_index": question_index,
             "question": question[:500],
             "truth": truth[:2000],
             "answer": answer[:2000],
             "context": context[:2000],
+        }
+    }
+    _event_logger.info("EvalQuestionResult", extra=props)
+    # Only compact fields are batched, so a batch holds dozens of questions
+    _question_result_batcher.add(
+        {
+            "run_id": run_id,
+            "question_index": question_index,
             "source": source,
             "groundedness": groundedness,
             "relevance": relevance,
             "citations_matched": citations_matched,
             "any_citation": any_citation,
-            "latency": latency,
+            "latency": round(latency, 3),
             "answer_length": answer_length,
         }
-    }
-    _event_logger.info("EvalQuestionResult", extra=props)
+    )
     logger.info("Emitted EvalQuestionResult event: run_id=%s q=%s", run_id, question[:80])
+
+
+def flush_eval_question_results():
+    """Emit any per-question results that are still buffered."""
+    _question_result_batcher.flush()
@@ -81,6 +81,16 @@ async def mock_search(self, *args, **kwargs):
     return MockAsyncSearchResultsIterator(kwargs.get("search_text"), kwargs.get("vector_queries"))
 
 
+async def process_page_image_passthrough(**kwargs):
+    return kwargs["image"]
+
+
+@pytest.fixture
+def mock_process_page_image(monkeypatch):
+    """Skip blob uploads and figure processing in parse_file, returning each image unchanged."""
+    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", process_page_image_passthrough)
+
+
 @pytest.fixture
 def mock_azurehttp_calls(monkeypatch):
     def mock_post(*args, **kwargs):
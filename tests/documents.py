@@ -0,0 +1,150 @@
+"""In-memory test documents and parsing helpers shared by the parser and extractor tests."""
+
+import copy
+import functools
+import io
+import itertools
+import json
+import pathlib
+import random
+from collections.abc import Iterable, Iterator
+
+import pptx.presentation
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+from prepdocslib.listfilestrategy import File
+from prepdocslib.page import ImageOnPage, Page
+from prepdocslib.parser import Parser
+
+
+@functools.cache
+def pdf_bytes(path: pathlib.Path) -> bytes:
+    """Read a test PDF from disk once per session."""
+    return path.read_bytes()
+
+
+def pdf_file(path: pathlib.Path) -> File:
+    """Create a File over a fresh, named buffer of the cached bytes of a test PDF."""
+    content = io.BytesIO(pdf_bytes(path))
+    content.name = path.name
+    return File(content=content)
+
+
+async def collect_pages(parser: Parser, content_bytes: bytes, name: str = "test.pdf") -> list[Page]:
+    """Run parser over a fresh named buffer of content_bytes and return every page it yields."""
+    content = io.BytesIO(content_bytes)
+    content.name = name
+    return [page async for page in parser.parse(content)]
+
+
+def iter_images(pages: Iterable[Page]) -> Iterator[ImageOnPage]:
+    """Iterate over the images of every page without building a flattened list."""
+    return itertools.chain.from_iterable(page.images for page in pages)
+
+
+@functools.cache
+def large_test_image() -> bytes:
+    """Create a noisy JPEG that is guaranteed to pass the 2 KB byte-size filter.
+
+    Solid-color images compress to a few hundred bytes, which is below the
+    2048-byte minimum threshold.  A random-noise image compresses much larger.
+    JPEG keeps it valid and well above the threshold at a fraction of PNG's
+    encode cost and size.  The result is cached because the PPTX/DOCX writers
+    only read the returned bytes.
+    """
+    rng = random.Random(42)  # deterministic for reproducibility
+    pixels = rng.randbytes(200 * 200 * 3)
+    img = Image.frombytes("RGB", (200, 200), pixels)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85)
+    data = buf.getvalue()
+    assert len(data) >= 2048, f"Test image only {len(data)} bytes — too small for filters"
+    return data
+
+
+# Shape placements (left, top, width, height), converted to EMU once.
+_TEXTBOX_BOX = (Inches(1), Inches(2), Inches(4), Inches(1))
+_PICTURE_BOX = (Inches(1), Inches(3), Inches(2), Inches(2))
+_TABLE_BOX = (Inches(1), Inches(4), Inches(6), Inches(2))
+
+
+@functools.cache
+def _blank_presentation() -> pptx.presentation.Presentation:
+    """Load python-pptx's default template once; builders deep-copy it instead of re-reading it."""
+    return Presentation()
+
+
+def new_presentation() -> pptx.presentation.Presentation:
+    """Return a fresh, empty presentation cloned from the cached default template."""
+    return copy.deepcopy(_blank_presentation())
+
+
+def build_pptx(slides: list[dict]) -> bytes:
+    """Build a PPTX in memory from a list of slide dicts.
+
+    Each dict may contain:
+        title (str | None): Title text for the slide.
+        body (str | None): Body text added via a textbox.
+        notes (str | None): Speaker notes text.
+        include_picture (bool): Whether to embed the noisy test image.
+        table (list[list[str]] | None): 2-D list of cell values for a table.
+
+    Identical specs share one build; the returned bytes are immutable.
+    """
+    return _build_pptx_cached(json.dumps(slides, sort_keys=True))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_pptx_cached(slides_json: str) -> bytes:
+    slides = json.loads(slides_json)
+    prs = new_presentation()
+    blank_layout = prs.slide_layouts[6]
+    content_layout = prs.slide_layouts[1]
+    # One stream for every picture; add_picture reads it fully, so rewind before each use.
+    img_stream = io.BytesIO(large_test_image())
+
+    for slide_spec in slides:
+        title = slide_spec.get("title")
+        body = slide_spec.get("body")
+        notes = slide_spec.get("notes")
+        include_picture = slide_spec.get("include_picture", False)
+        table_data = slide_spec.get("table")
+
+        # Choose layout: blank (6) when nothing is provided, title+content (1) otherwise
+        is_empty = title is None and body is None and notes is None and not include_picture and table_data is None
+        slide_layout = blank_layout if is_empty else content_layout
+        slide = prs.slides.add_slide(slide_layout)
+
+        # Title
+        if title is not None and slide.shapes.title is not None:
+            slide.shapes.title.text = title
+
+        # Body text via textbox
+        if body is not None:
+            txBox = slide.shapes.add_textbox(*_TEXTBOX_BOX)
+            txBox.text_frame.text = body
+
+        # Speaker notes
+        if notes is not None:
+            notes_slide = slide.notes_slide
+            notes_slide.notes_text_frame.text = notes
+
+        # Picture
+        if include_picture:
+            img_stream.seek(0)
+            slide.shapes.add_picture(img_stream, *_PICTURE_BOX)
+
+        # Table
+        if table_data is not None:
+            rows = len(table_data)
+            cols = len(table_data[0]) if rows > 0 else 0
+            cell = slide.shapes.add_table(rows, cols, *_TABLE_BOX).table.cell
+            for r_idx, row in enumerate(table_data):
+                for c_idx, cell_text in enumerate(row):
+                    cell(r_idx, c_idx).text = cell_text
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
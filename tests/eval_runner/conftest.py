@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The Functions host loads eval_runner from its own directory, so its modules import
+# each other by top-level name ("from telemetry import ..."). Only these tests get that path.
+EVAL_RUNNER_DIR = str(Path(__file__).resolve().parents[2] / "app" / "functions" / "eval_runner")
+if EVAL_RUNNER_DIR not in sys.path:
+    sys.path.append(EVAL_RUNNER_DIR)
@@ -0,0 +1,324 @@
+import functools
+import json
+from typing import Any
+
+import httpx
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+
+from tests.mocks import MockAzureCredential
+
+pytest.importorskip("opencensus.ext.azure", reason="eval_runner telemetry needs opencensus-ext-azure")
+
+import eval_engine  # noqa: E402
+
+TARGET_URL = "https://app.example.com/chat"
+
+
+class BlobStub:
+    def __init__(self, blobs: dict[str, bytes], name: str) -> None:
+        self.blobs = blobs
+        self.name = name
+
+    async def download_blob(self):
+        if self.name not in self.blobs:
+            raise ResourceNotFoundError("missing")
+        content = self.blobs[self.name]
+
+        class Downloader:
+            async def readall(self) -> bytes:
+                return content
+
+        return Downloader()
+
+    async def upload_blob(self, data: str, overwrite: bool = False) -> None:
+        self.blobs[self.name] = data.encode("utf-8")
+
+
+class ContainerStub:
+    def __init__(self, blobs: dict[str, bytes]) -> None:
+        self.blobs = blobs
+
+    def get_blob_client(self, name: str) -> BlobStub:
+        return BlobStub(self.blobs, name)
+
+
+class BlobServiceStub:
+    def __init__(self, blobs: dict[str, bytes]) -> None:
+        self.blobs = blobs
+        self.closed = False
+
+    def get_container_client(self, name: str) -> ContainerStub:
+        return ContainerStub(self.blobs)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def chat_response(answer: str, data_points: Any) -> httpx.Response:
+    return httpx.Response(200, json={"message": {"content": answer}, "context": {"data_points": data_points}})
+
+
+def grade_response(score: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": score}}]})
+
+
+@pytest.fixture
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    delays: list[float] = []
+
+    async def record_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(eval_engine.asyncio, "sleep", record_sleep)
+    return delays
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        ("See [report.pdf#page=2].", True),
+        ("See [image.PNG] and [notes.txt(part 1)].", True),
+        ("No citations here.", False),
+        ("[not a citation]", False),
+    ],
+)
+def test_compute_any_citation(response: str, expected: bool) -> None:
+    assert eval_engine._compute_any_citation(response) is expected
+
+
+@pytest.mark.parametrize(
+    "response, truth, expected",
+    [
+        ("[a.pdf#page=1] [b.pdf#page=2]", "[a.pdf#page=1] [b.pdf#page=2]", 1.0),
+        ("[a.pdf#page=1]", "[a.pdf#page=1] [b.pdf#page=2]", 0.5),
+        ("[c.pdf]", "[a.pdf#page=1]", 0.0),
+        ("[a.pdf#page=1]", "No citations in the truth.", 0.0),
+    ],
+)
+def test_compute_citations_matched(response: str, truth: str, expected: float) -> None:
+    assert eval_engine._compute_citations_matched(response, truth) == expected
+
+
+@pytest.mark.asyncio
+async def test_get_bearer_token() -> None:
+    assert await eval_engine._get_bearer_token(MockAzureCredential(), "app-id") == "mock-token"
+    assert await eval_engine._get_bearer_token(MockAzureCredential(), "") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "bearer_token, eval_api_key, expected_headers",
+    [
+        (None, "secret", {"x-eval-api-key": "secret"}),
+        ("token", None, {"authorization": "Bearer token"}),
+        (None, None, {}),
+    ],
+)
+async def test_call_chat_endpoint_auth_headers(
+    bearer_token: str | None, eval_api_key: str | None, expected_headers: dict[str, str]
+) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return chat_response("Answer [a.pdf#page=1]", {"text": ["first", "second"]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        answer, context_texts, latency = await eval_engine._call_chat_endpoint(
+            client, TARGET_URL, "What?", {"top": 3}, bearer_token, eval_api_key
+        )
+
+    assert (answer, context_texts) == ("Answer [a.pdf#page=1]", ["first", "second"])
+    assert latency >= 0
+    (request,) = requests
+    for name in ("x-eval-api-key", "authorization"):
+        assert request.headers.get(name) == expected_headers.get(name)
+    assert json.loads(request.content) == {
+        "messages": [{"content": "What?", "role": "user"}],
+        "context": {"overrides": {"top": 3}},
+        "stream": False,
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        (httpx.Response(200, json={"message": "plain", "context": {"data_points": ["one"]}}), ("plain", ["one"])),
+        (httpx.Response(200, json={}), ("", [])),
+        (httpx.Response(502, text="bad gateway"), ("", [])),
+    ],
+    ids=["string-message-and-list-data-points", "empty-body", "error-status"],
+)
+async def test_call_chat_endpoint_response_shapes(response: httpx.Response, expected: tuple[str, list[str]]) -> None:
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: response)) as client:
+        answer, context_texts, _ = await eval_engine._call_chat_endpoint(client, TARGET_URL, "What?", {})
+
+    assert (answer, context_texts) == expected
+
+
+async def grade(handler) -> dict[str, float]:
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        return await eval_engine._grade_with_gpt(
+            client, "https://openai.example.com", "eval", MockAzureCredential(), "What?", "Answer", ["context"]
+        )
+
+
+@pytest.mark.asyncio
+async def test_grade_with_gpt_scores_both_metrics() -> None:
+    prompts: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/openai/deployments/eval/chat/completions"
+        assert request.headers["authorization"] == "Bearer mock-token"
+        prompts.append(json.loads(request.content)["messages"][0]["content"])
+        return grade_response("5" if len(prompts) == 1 else " 3\n")
+
+    assert await grade(handler) == {"groundedness": 5.0, "relevance": 3.0}
+    assert "groundedness" in prompts[0] and "context" in prompts[0]
+    assert "relevance" in prompts[1] and "What?" in prompts[1]
+
+
+@pytest.mark.asyncio
+async def test_grade_with_gpt_retries_after_rate_limit(no_sleep: list[float]) -> None:
+    responses = iter([httpx.Response(429, headers={"retry-after": "7"}), grade_response("4"), grade_response("2")])
+
+    assert await grade(lambda request: next(responses)) == {"groundedness": 4.0, "relevance": 2.0}
+    assert no_sleep == [7]
+
+
+@pytest.mark.asyncio
+async def test_grade_with_gpt_scores_failures_as_minus_one(no_sleep: list[float]) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["messages"][0]["content"])
+        if "groundedness" in calls[-1]:
+            return httpx.Response(500)
+        raise httpx.ConnectError("unreachable")
+
+    assert await grade(handler) == {"groundedness": -1.0, "relevance": -1.0}
+    # The error status is final; the connection error is retried with backoff
+    assert len(calls) == 5
+    assert no_sleep == [1, 2, 4]
+
+
+@pytest.fixture
+def evaluation_env(monkeypatch: pytest.MonkeyPatch) -> dict[str, list]:
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT", "teststorage")
+    monkeypatch.setenv("EVAL_TARGET_URL", TARGET_URL)
+    monkeypatch.setenv("EVAL_TARGET_APP_ID", "target-app")
+    monkeypatch.delenv("EVAL_API_KEY", raising=False)
+    monkeypatch.delenv("AZURE_OPENAI_CUSTOM_URL", raising=False)
+    monkeypatch.setenv("AZURE_OPENAI_SERVICE", "test-openai")
+    emitted: dict[str, list] = {"questions": [], "runs": []}
+    monkeypatch.setattr(eval_engine, "emit_eval_question_result", lambda **kwargs: emitted["questions"].append(kwargs))
+    monkeypatch.setattr(eval_engine, "emit_eval_run_completed", lambda **kwargs: emitted["runs"].append(kwargs))
+    return emitted
+
+
+def install_blob_service(monkeypatch: pytest.MonkeyPatch, blobs: dict[str, bytes]) -> BlobServiceStub:
+    blob_service = BlobServiceStub(blobs)
+    monkeypatch.setattr(eval_engine, "BlobServiceClient", lambda url, credential: blob_service)
+    return blob_service
+
+
+def install_http_handler(monkeypatch: pytest.MonkeyPatch, handler) -> None:
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(eval_engine.httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=transport))
+
+
+def jsonl(*records: dict) -> bytes:
+    return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation(monkeypatch: pytest.MonkeyPatch, evaluation_env: dict[str, list]) -> None:
+    blob_service = install_blob_service(
+        monkeypatch,
+        {
+            "ground-truth/ground_truth.jsonl": jsonl(
+                {"question": "Q1?", "truth": "A1 [a.pdf#page=1]"}, {"question": "Q2?", "truth": "A2 [b.pdf#page=2]"}
+            ),
+            "ground-truth/manual_questions.jsonl": jsonl({"question": "Q3?", "truth": "A3"}),
+        },
+    )
+    chat_requests: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.host == "app.example.com":
+            assert request.headers["authorization"] == "Bearer mock-token"
+            chat_requests.append(body)
+            question = body["messages"][0]["content"]
+            citation = " [a.pdf#page=1]" if question == "Q1?" else ""
+            return chat_response(f"Answer to {question}{citation}", {"text": [f"context for {question}"]})
+        assert request.url.host == "test-openai.openai.azure.com"
+        return grade_response("5" if "Q2?" not in body["messages"][0]["content"] else "2")
+
+    install_http_handler(monkeypatch, handler)
+
+    summary = await eval_engine.run_evaluation(MockAzureCredential(), overrides={"top": 5}, num_questions=3)
+
+    # Questions run concurrently, so requests may arrive in any order
+    assert sorted(request["messages"][0]["content"] for request in chat_requests) == ["Q1?", "Q2?", "Q3?"]
+    assert chat_requests[0]["context"]["overrides"] == {**eval_engine.DEFAULT_OVERRIDES, "top": 5}
+    run_id = summary["run_id"]
+    assert summary["num_questions"] == 3
+    assert summary["target_url"] == TARGET_URL
+    assert summary["any_citation_rate"] == 0.333
+    assert summary["citations_matched_rate"] == 0.333
+    assert summary["relevance_pass_rate"] == 0.667
+    assert blob_service.closed
+
+    results = [json.loads(line) for line in blob_service.blobs[f"runs/{run_id}/eval_results.jsonl"].splitlines()]
+    assert [(r["question"], r["source"]) for r in results] == [
+        ("Q1?", "generated"),
+        ("Q2?", "generated"),
+        ("Q3?", "manual"),
+    ]
+    assert results[0]["context"] == ["context for Q1?"]
+    assert json.loads(blob_service.blobs[f"runs/{run_id}/summary.json"]) == summary
+
+    assert sorted(question["question_index"] for question in evaluation_env["questions"]) == [0, 1, 2]
+    (run,) = evaluation_env["runs"]
+    assert run["run_id"] == run_id
+    assert run["num_questions"] == 3
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_without_manual_questions_or_grades(
+    monkeypatch: pytest.MonkeyPatch, evaluation_env: dict[str, list]
+) -> None:
+    monkeypatch.setenv("EVAL_API_KEY", "secret")
+    monkeypatch.setenv("AZURE_OPENAI_CUSTOM_URL", "https://proxy.example.com/openai/v1?x=1")
+    blob_service = install_blob_service(
+        monkeypatch,
+        {
+            "ground-truth/ground_truth.jsonl": jsonl(
+                {"question": "Q1?", "truth": "A1"}, {"question": "Q2?", "truth": "A2"}
+            )
+        },
+    )
+    hosts: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        if request.url.host == "app.example.com":
+            assert request.headers["x-eval-api-key"] == "secret"
+            return chat_response("An answer", [])
+        return httpx.Response(400)
+
+    install_http_handler(monkeypatch, handler)
+
+    summary = await eval_engine.run_evaluation(MockAzureCredential(), num_questions=1)
+
+    assert hosts == ["app.example.com", "proxy.example.com", "proxy.example.com"]
+    assert summary["num_questions"] == 1
+    assert summary["groundedness_mean"] == summary["relevance_mean"] == -1
+    assert summary["groundedness_pass_rate"] == summary["relevance_pass_rate"] == 0
+    (result,) = [
+        json.loads(line) for line in blob_service.blobs[f"runs/{summary['run_id']}/eval_results.jsonl"].splitlines()
+    ]
+    assert result["source"] == "generated"
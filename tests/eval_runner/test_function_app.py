@@ -0,0 +1,774 @@
+import json
+import logging
+import sys
+import threading
+import types
+from datetime import datetime, timezone
+from typing import Any
+
+import azure.functions as func
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+
+from tests.mocks import MockAzureCredential
+
+pytest.importorskip("opencensus.ext.azure", reason="eval_runner telemetry needs opencensus-ext-azure")
+
+import function_app as eval_runner  # noqa: E402
+
+
+def build_request(payload: Any) -> func.HttpRequest:
+    """Construct an HttpRequest carrying the provided JSON payload."""
+    return func.HttpRequest(
+        method="POST",
+        url="http://localhost/api",
+        headers={},
+        params={},
+        body=json.dumps(payload).encode("utf-8"),
+    )
+
+
+class QueueOutputStub:
+    """Stand-in for the func.Out[str] queue output binding."""
+
+    def __init__(self) -> None:
+        self.value: str | None = None
+
+    def set(self, val: str) -> None:
+        self.value = val
+
+    def get(self) -> str | None:
+        return self.value
+
+
+@pytest.fixture
+def eval_runner_jobs(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    """Configure eval_runner settings and record every job status document it writes."""
+    monkeypatch.setattr(
+        eval_runner,
+        "settings",
+        eval_runner.GlobalSettings(
+            async_credential=MockAzureCredential(),
+            sync_credential=MockAzureCredential(),
+            storage_account="teststorage",
+            eval_blob_container="eval-data",
+        ),
+    )
+    written: list[dict] = []
+
+    async def record_job_status(settings, job: dict) -> None:
+        written.append(json.loads(json.dumps(job)))
+
+    monkeypatch.setattr(eval_runner, "_write_job_status", record_job_status)
+    return written
+
+
+def build_queue_message(payload: dict[str, Any]) -> func.QueueMessage:
+    return func.QueueMessage(body=json.dumps(payload).encode("utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_generate_queues_job(eval_runner_jobs: list[dict]) -> None:
+    job_queue = QueueOutputStub()
+
+    response = await eval_runner.generate_ground_truth(build_request({"num_questions": 5}), job_queue)
+
+    assert response.status_code == 202
+    body = json.loads(response.get_body().decode("utf-8"))
+    assert body["status"] == "queued"
+    assert [job["status"] for job in eval_runner_jobs] == ["queued"]
+    assert eval_runner_jobs[0]["job_id"] == body["job_id"]
+    assert job_queue.value is not None
+    assert json.loads(job_queue.value) == {
+        "job_id": body["job_id"],
+        "operation": "generate",
+        "params": {"num_questions": 5, "num_search_documents": None},
+    }
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_evaluate_queues_job(eval_runner_jobs: list[dict]) -> None:
+    job_queue = QueueOutputStub()
+    request = build_request({"num_questions": 3, "overrides": {"top": 5}})
+
+    response = await eval_runner.run_evaluation(request, job_queue)
+
+    assert response.status_code == 202
+    body = json.loads(response.get_body().decode("utf-8"))
+    assert eval_runner_jobs[0]["operation"] == "evaluate"
+    assert eval_runner_jobs[0]["job_id"] == body["job_id"]
+    assert job_queue.value is not None
+    assert json.loads(job_queue.value)["params"] == {"num_questions": 3, "overrides": {"top": 5}}
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_job_success(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    received: list[dict] = []
+
+    async def fake_generate(settings, params: dict) -> tuple[dict, str]:
+        received.append(params)
+        return {"qa_pairs_generated": 7}, "qa_pairs=7"
+
+    monkeypatch.setitem(eval_runner._JOB_RUNNERS, "generate", fake_generate)
+
+    await eval_runner.run_job(
+        build_queue_message({"job_id": "job-1", "operation": "generate", "params": {"num_questions": 7}})
+    )
+
+    assert received == [{"num_questions": 7}]
+    assert [job["status"] for job in eval_runner_jobs] == ["running", "success"]
+    final = eval_runner_jobs[-1]
+    assert final["job_id"] == "job-1"
+    assert final["qa_pairs_generated"] == 7
+    assert "started_at" in final and "completed_at" in final and "duration_seconds" in final
+    assert "error" not in final
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_job_error(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    async def failing_evaluate(settings, params: dict) -> tuple[dict, str]:
+        raise RuntimeError("chat endpoint unavailable")
+
+    monkeypatch.setitem(eval_runner._JOB_RUNNERS, "evaluate", failing_evaluate)
+
+    # The failure is recorded on the job rather than raised, so the queue does not retry it
+    await eval_runner.run_job(build_queue_message({"job_id": "job-2", "operation": "evaluate", "params": {}}))
+
+    assert [job["status"] for job in eval_runner_jobs] == ["running", "error"]
+    assert eval_runner_jobs[-1]["error"] == "chat endpoint unavailable"
+    assert "completed_at" in eval_runner_jobs[-1]
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_job_unknown_operation(eval_runner_jobs: list[dict]) -> None:
+    await eval_runner.run_job(build_queue_message({"job_id": "job-3", "operation": "bogus"}))
+
+    assert [job["status"] for job in eval_runner_jobs] == ["running", "error"]
+    assert eval_runner_jobs[-1]["error"] == "Unknown operation: bogus"
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_job_without_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(eval_runner, "settings", None)
+
+    with pytest.raises(RuntimeError, match="Settings not initialized"):
+        await eval_runner.run_job(build_queue_message({"job_id": "job-4", "operation": "generate"}))
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_job_raises_when_status_write_fails(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]
+) -> None:
+    async def failing_write(settings, job: dict) -> None:
+        raise ResourceNotFoundError("storage unavailable")
+
+    monkeypatch.setattr(eval_runner, "_write_job_status", failing_write)
+
+    # Raising hands the message to the poison queue, where fail_job records the failure
+    with pytest.raises(ResourceNotFoundError):
+        await eval_runner.run_job(build_queue_message({"job_id": "job-6", "operation": "generate"}))
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_fail_job_marks_poisoned_job_as_error(eval_runner_jobs: list[dict]) -> None:
+    message = {"job_id": "job-7", "operation": "evaluate", "params": {"num_questions": 3}}
+
+    await eval_runner.fail_job(build_queue_message(message))
+
+    (job,) = eval_runner_jobs
+    assert job["job_id"] == "job-7"
+    assert job["operation"] == "evaluate"
+    assert job["params"] == {"num_questions": 3}
+    assert job["status"] == "error"
+    assert job["error"] == "Job did not complete: its worker failed, timed out or was restarted"
+    assert "completed_at" in job
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_fail_job_without_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(eval_runner, "settings", None)
+
+    with pytest.raises(RuntimeError, match="Settings not initialized"):
+        await eval_runner.fail_job(build_queue_message({"job_id": "job-8", "operation": "generate"}))
+
+
+class JobBlobStub:
+    def __init__(self, content: bytes | None) -> None:
+        self.content = content
+
+    async def download_blob(self):
+        if self.content is None:
+            raise ResourceNotFoundError("missing")
+        content = self.content
+
+        class Downloader:
+            async def readall(self) -> bytes:
+                return content
+
+        return Downloader()
+
+
+class JobContainerStub:
+    def __init__(self, blobs: dict[str, bytes]) -> None:
+        self.blobs = blobs
+
+    def get_blob_client(self, name: str) -> JobBlobStub:
+        return JobBlobStub(self.blobs.get(name))
+
+
+class JobBlobServiceStub:
+    def __init__(self, blobs: dict[str, bytes]) -> None:
+        self.blobs = blobs
+
+    def get_container_client(self, name: str) -> JobContainerStub:
+        return JobContainerStub(self.blobs)
+
+
+def build_job_request(job_id: str) -> func.HttpRequest:
+    return func.HttpRequest(
+        method="GET",
+        url=f"http://localhost/api/jobs/{job_id}",
+        headers={},
+        params={},
+        route_params={"job_id": job_id},
+        body=b"",
+    )
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_get_job(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    job = {"job_id": "job-5", "operation": "generate", "status": "success", "qa_pairs_generated": 3}
+    blob_service = JobBlobServiceStub({"jobs/job-5.json": json.dumps(job).encode("utf-8")})
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    response = await eval_runner.get_job(build_job_request("job-5"))
+
+    assert response.status_code == 200
+    assert json.loads(response.get_body().decode("utf-8")) == job
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_get_job_not_found(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    blob_service = JobBlobServiceStub({})
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    response = await eval_runner.get_job(build_job_request("missing-job"))
+
+    assert response.status_code == 404
+    body = json.loads(response.get_body().decode("utf-8"))
+    assert body["error"] == "Job missing-job not found"
+
+
+def build_run_request(run_id: str) -> func.HttpRequest:
+    return func.HttpRequest(
+        method="GET",
+        url=f"http://localhost/api/runs/{run_id}",
+        headers={},
+        params={},
+        route_params={"run_id": run_id},
+        body=b"",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "results_jsonl",
+    [
+        b'{"question": "q1", "groundedness": 5}\n{"question": "q2", "groundedness": 3}\n',
+        b'\xef\xbb\xbf{"question": "q1", "groundedness": 5}\r\n\n  \n{"question": "q2", "groundedness": 3}',
+        b'{"question": "q1", "groundedness": 5}\nnot json\n{"question": "q2", "groundedness": 3}\n{"question": "q3", "gro',
+    ],
+    ids=["normal", "bom-crlf-and-blank-lines", "malformed-and-partial-lines"],
+)
+async def test_eval_runner_get_run(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict], results_jsonl: bytes
+) -> None:
+    summary = {"num_questions": 2, "groundedness_pass_rate": 0.5}
+    blob_service = JobBlobServiceStub(
+        {"runs/run-1/summary.json": json.dumps(summary).encode("utf-8"), "runs/run-1/eval_results.jsonl": results_jsonl}
+    )
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    response = await eval_runner.get_run(build_run_request("run-1"))
+
+    assert response.status_code == 200
+    assert json.loads(response.get_body().decode("utf-8")) == {
+        "run_id": "run-1",
+        "summary": summary,
+        "results": [{"question": "q1", "groundedness": 5}, {"question": "q2", "groundedness": 3}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_get_run_logs_skipped_lines(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict], caplog
+) -> None:
+    blob_service = JobBlobServiceStub(
+        {"runs/run-1/summary.json": b"{}", "runs/run-1/eval_results.jsonl": b'{"question": "q1"}\n{"question": '}
+    )
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    with caplog.at_level(logging.WARNING):
+        response = await eval_runner.get_run(build_run_request("run-1"))
+
+    assert json.loads(response.get_body().decode("utf-8"))["results"] == [{"question": "q1"}]
+    assert "Skipping malformed line 2 of runs/run-1/eval_results.jsonl" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_get_run_not_found(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    blob_service = JobBlobServiceStub({})
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    response = await eval_runner.get_run(build_run_request("missing-run"))
+
+    assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_blob_service_client_is_shared(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(eval_runner, "_blob_service_client", None)
+    settings = eval_runner.GlobalSettings(
+        async_credential=MockAzureCredential(),
+        sync_credential=MockAzureCredential(),
+        storage_account="teststorage",
+        eval_blob_container="eval-data",
+    )
+
+    client = eval_runner._get_blob_service_client(settings)
+    transport = client._pipeline._transport
+    try:
+        assert eval_runner._get_blob_service_client(settings) is client
+        assert eval_runner._get_blob_service_client(settings)._pipeline._transport is transport
+        assert client.url == "https://teststorage.blob.core.windows.net/"
+        # The session outlives the clients built on it, so closing one must not close it
+        assert transport._session_owner is False
+        await client.get_container_client("eval-data").close()
+        assert not transport.session.closed
+    finally:
+        await transport.session.close()
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_warmup_starts_once_and_does_not_block_requests(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]
+) -> None:
+    monkeypatch.delenv("RUNNING_IN_PRODUCTION", raising=False)
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT", "teststorage")
+    monkeypatch.setattr(eval_runner, "DefaultAzureCredential", MockAzureCredential)
+    monkeypatch.setattr(eval_runner, "SyncDefaultAzureCredential", MockAzureCredential)
+    monkeypatch.setattr(eval_runner, "_warmup_thread", None)
+    release = threading.Event()
+    warmups: list[str] = []
+
+    def slow_warm_up() -> None:
+        warmups.append(threading.current_thread().name)
+        release.wait(timeout=5)
+
+    monkeypatch.setattr(eval_runner, "_warm_up_ground_truth_engine", slow_warm_up)
+
+    try:
+        eval_runner.configure_global_settings()
+        warmup_thread = eval_runner._warmup_thread
+        eval_runner.configure_global_settings()
+        assert eval_runner._warmup_thread is warmup_thread
+
+        # Requests are served while the warmup thread is still importing
+        response = await eval_runner.generate_ground_truth(build_request({"num_questions": 5}), QueueOutputStub())
+        assert response.status_code == 202
+        assert warmup_thread is not None and warmup_thread.is_alive()
+    finally:
+        release.set()
+    warmup_thread.join(timeout=5)
+
+    assert warmups == ["ground-truth-warmup"]
+
+
+@pytest.mark.parametrize(
+    "module, expected_log",
+    [
+        (types.ModuleType("ground_truth_engine"), "Ground truth engine warmed up"),
+        (None, "Could not warm up ground truth engine"),
+    ],
+    ids=["imported", "import-fails"],
+)
+def test_eval_runner_warmup_logs_outcome(
+    monkeypatch: pytest.MonkeyPatch, caplog, module: types.ModuleType | None, expected_log: str
+) -> None:
+    # A None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "ground_truth_engine", module)
+    monkeypatch.setattr(eval_runner, "_warmup_thread", None)
+    thread_errors: list[threading.ExceptHookArgs] = []
+    monkeypatch.setattr(threading, "excepthook", thread_errors.append)
+
+    with caplog.at_level(logging.INFO):
+        eval_runner._start_ground_truth_warmup()
+        assert eval_runner._warmup_thread is not None
+        eval_runner._warmup_thread.join(timeout=5)
+
+    assert expected_log in caplog.text
+    assert thread_errors == []
+
+
+@pytest.mark.parametrize(
+    "value, expected_error",
+    [
+        (None, None),
+        (1, None),
+        (1000, None),
+        (True, "num_questions must be a positive integer"),
+        (1.0, "num_questions must be a positive integer"),
+        (0, "num_questions must be a positive integer"),
+        ("5", "num_questions must be a positive integer"),
+        (1001, "num_questions must be at most 1000"),
+    ],
+)
+def test_eval_runner_validate_count(value: Any, expected_error: str | None) -> None:
+    body = {} if value is None else {"num_questions": value}
+
+    assert eval_runner._validate_count(body, "num_questions", eval_runner.MAX_NUM_QUESTIONS) == expected_error
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, payload, expected_error",
+    [
+        ("generate_ground_truth", [1, 2], "Request body must be a JSON object"),
+        ("generate_ground_truth", {"num_questions": True}, "num_questions must be a positive integer"),
+        ("generate_ground_truth", {"num_questions": 1001}, "num_questions must be at most 1000"),
+        ("generate_ground_truth", {"num_search_documents": 0}, "num_search_documents must be a positive integer"),
+        ("run_evaluation", "not an object", "Request body must be a JSON object"),
+        ("run_evaluation", {"overrides": ["top"]}, "overrides must be a JSON object"),
+        ("run_evaluation", {"num_questions": 1.0}, "num_questions must be a positive integer"),
+    ],
+)
+async def test_eval_runner_rejects_invalid_body(
+    eval_runner_jobs: list[dict], handler: str, payload: Any, expected_error: str
+) -> None:
+    job_queue = QueueOutputStub()
+
+    response = await getattr(eval_runner, handler)(build_request(payload), job_queue)
+
+    assert response.status_code == 400
+    assert json.loads(response.get_body().decode("utf-8"))["error"] == expected_error
+    assert eval_runner_jobs == []
+    assert job_queue.value is None
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_generate_clamps_num_search_documents(eval_runner_jobs: list[dict]) -> None:
+    job_queue = QueueOutputStub()
+
+    response = await eval_runner.generate_ground_truth(build_request({"num_search_documents": 75000}), job_queue)
+
+    assert response.status_code == 202
+    assert eval_runner_jobs[0]["params"] == {"num_questions": 50, "num_search_documents": 50000}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, expected_params",
+    [
+        ("generate_ground_truth", {"num_questions": 50, "num_search_documents": None}),
+        ("run_evaluation", {"num_questions": None, "overrides": None}),
+    ],
+)
+async def test_eval_runner_treats_unparseable_body_as_empty(
+    eval_runner_jobs: list[dict], handler: str, expected_params: dict
+) -> None:
+    request = func.HttpRequest(method="POST", url="http://localhost/api", headers={}, params={}, body=b"not json")
+
+    response = await getattr(eval_runner, handler)(request, QueueOutputStub())
+
+    assert response.status_code == 202
+    assert eval_runner_jobs[0]["params"] == expected_params
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, request_",
+    [
+        ("generate_ground_truth", build_request({})),
+        ("run_evaluation", build_request({})),
+        ("get_job", build_job_request("job-1")),
+        ("list_runs", build_run_request("")),
+        ("get_run", build_run_request("run-1")),
+    ],
+)
+async def test_eval_runner_http_handlers_without_settings(
+    monkeypatch: pytest.MonkeyPatch, handler: str, request_: func.HttpRequest
+) -> None:
+    monkeypatch.setattr(eval_runner, "settings", None)
+    args = (request_, QueueOutputStub()) if handler in ("generate_ground_truth", "run_evaluation") else (request_,)
+
+    response = await getattr(eval_runner, handler)(*args)
+
+    assert response.status_code == 500
+    assert json.loads(response.get_body().decode("utf-8")) == {"error": "Settings not initialized"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, request_, expected_error",
+    [
+        ("get_job", build_job_request(""), "job_id is required"),
+        ("get_run", build_run_request(""), "run_id is required"),
+    ],
+)
+async def test_eval_runner_http_handlers_require_route_id(
+    eval_runner_jobs: list[dict], handler: str, request_: func.HttpRequest, expected_error: str
+) -> None:
+    response = await getattr(eval_runner, handler)(request_)
+
+    assert response.status_code == 400
+    assert json.loads(response.get_body().decode("utf-8")) == {"error": expected_error}
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_get_job_storage_error(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    blob_service = JobBlobServiceStub({"jobs/job-1.json": b"{not json"})
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: blob_service)
+
+    response = await eval_runner.get_job(build_job_request("job-1"))
+
+    assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_enqueue_job_write_failure(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]
+) -> None:
+    async def failing_write(settings, job: dict) -> None:
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(eval_runner, "_write_job_status", failing_write)
+    job_queue = QueueOutputStub()
+
+    response = await eval_runner.run_evaluation(build_request({}), job_queue)
+
+    assert response.status_code == 500
+    assert json.loads(response.get_body().decode("utf-8")) == {"error": "storage unavailable"}
+    # Nothing is queued for a job whose status could not be recorded
+    assert job_queue.value is None
+
+
+class UploadBlobStub:
+    def __init__(self, container: "UploadContainerStub", name: str) -> None:
+        self.container = container
+        self.name = name
+
+    async def upload_blob(self, data: str, overwrite: bool = False) -> None:
+        if not self.container.exists:
+            raise ResourceNotFoundError("container not found")
+        self.container.blobs[self.name] = data
+
+
+class UploadContainerStub:
+    def __init__(self) -> None:
+        self.exists = False
+        self.blobs: dict[str, str] = {}
+
+    def get_blob_client(self, name: str) -> UploadBlobStub:
+        return UploadBlobStub(self, name)
+
+    async def create_container(self) -> None:
+        self.exists = True
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_write_job_status_creates_container(monkeypatch: pytest.MonkeyPatch) -> None:
+    container = UploadContainerStub()
+
+    class BlobService:
+        def get_container_client(self, name: str) -> UploadContainerStub:
+            assert name == "eval-data"
+            return container
+
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: BlobService())
+    settings = eval_runner.GlobalSettings(
+        async_credential=MockAzureCredential(),
+        sync_credential=MockAzureCredential(),
+        storage_account="teststorage",
+        eval_blob_container="eval-data",
+    )
+
+    await eval_runner._write_job_status(settings, {"job_id": "job-1", "status": "queued"})
+
+    assert container.exists
+    assert json.loads(container.blobs["jobs/job-1.json"]) == {"job_id": "job-1", "status": "queued"}
+
+
+class CredentialRecorder:
+    created: list[tuple[str, dict]] = []
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.created.append((type(self).__name__, kwargs))
+
+
+class AsyncManagedIdentity(CredentialRecorder):
+    pass
+
+
+class SyncManagedIdentity(CredentialRecorder):
+    pass
+
+
+@pytest.mark.parametrize("client_id, expected_kwargs", [("client-123", {"client_id": "client-123"}), (None, {})])
+def test_eval_runner_configure_global_settings_in_production(
+    monkeypatch: pytest.MonkeyPatch, client_id: str | None, expected_kwargs: dict
+) -> None:
+    monkeypatch.setenv("RUNNING_IN_PRODUCTION", "true")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT", "teststorage")
+    monkeypatch.setenv("EVAL_BLOB_CONTAINER", "custom-container")
+    if client_id:
+        monkeypatch.setenv("AZURE_CLIENT_ID", client_id)
+    else:
+        monkeypatch.delenv("AZURE_CLIENT_ID", raising=False)
+    monkeypatch.setattr(CredentialRecorder, "created", [])
+    monkeypatch.setattr(eval_runner, "ManagedIdentityCredential", AsyncManagedIdentity)
+    monkeypatch.setattr(eval_runner, "SyncManagedIdentityCredential", SyncManagedIdentity)
+    monkeypatch.setattr(eval_runner, "_start_ground_truth_warmup", lambda: None)
+    monkeypatch.setattr(eval_runner, "settings", None)
+
+    eval_runner.configure_global_settings()
+
+    assert CredentialRecorder.created == [
+        ("AsyncManagedIdentity", expected_kwargs),
+        ("SyncManagedIdentity", expected_kwargs),
+    ]
+    assert eval_runner.settings is not None
+    assert isinstance(eval_runner.settings.async_credential, AsyncManagedIdentity)
+    assert eval_runner.settings.storage_account == "teststorage"
+    assert eval_runner.settings.eval_blob_container == "custom-container"
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_run_generate_job(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    calls: list[dict] = []
+
+    async def generate_ground_truth(**kwargs: Any) -> int:
+        calls.append(kwargs)
+        return 4
+
+    engine = types.ModuleType("ground_truth_engine")
+    engine.generate_ground_truth = generate_ground_truth  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "ground_truth_engine", engine)
+    settings = eval_runner.settings
+    assert settings is not None
+
+    result = await eval_runner._run_generate_job(settings, {"num_questions": 4, "num_search_documents": 10})
+
+    assert result == ({"qa_pairs_generated": 4}, "qa_pairs=4")
+    assert calls == [
+        {
+            "credential": settings.async_credential,
+            "sync_credential": settings.sync_credential,
+            "num_questions": 4,
+            "num_search_documents": 10,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fails", [False, True])
+async def test_eval_runner_run_evaluate_job_flushes_results(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict], fails: bool
+) -> None:
+    flushes: list[bool] = []
+
+    async def run_evaluation(**kwargs: Any) -> dict:
+        assert kwargs["overrides"] == {"top": 5}
+        assert kwargs["num_questions"] == 2
+        if fails:
+            raise RuntimeError("chat endpoint unavailable")
+        return {"run_id": "run-1", "num_questions": 2}
+
+    monkeypatch.setattr(eval_runner, "run_eval", run_evaluation)
+    monkeypatch.setattr(eval_runner, "flush_eval_question_results", lambda: flushes.append(True))
+    settings = eval_runner.settings
+    assert settings is not None
+    params = {"num_questions": 2, "overrides": {"top": 5}}
+
+    if fails:
+        with pytest.raises(RuntimeError):
+            await eval_runner._run_evaluate_job(settings, params)
+    else:
+        result = await eval_runner._run_evaluate_job(settings, params)
+        assert result == ({"summary": {"run_id": "run-1", "num_questions": 2}}, "run_id=run-1 questions=2")
+    # Buffered question results are sent whether or not the run succeeded
+    assert flushes == [True]
+
+
+class ListedBlob:
+    def __init__(self, name: str, last_modified: datetime | None) -> None:
+        self.name = name
+        self.last_modified = last_modified
+
+
+class RunsContainerStub(JobContainerStub):
+    def __init__(self, blobs: dict[str, bytes], listed: list[ListedBlob]) -> None:
+        super().__init__(blobs)
+        self.listed = listed
+
+    async def list_blobs(self, name_starts_with: str):
+        assert name_starts_with == "runs/"
+        for blob in self.listed:
+            yield blob
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_list_runs(monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]) -> None:
+    summaries = {
+        "old": {"num_questions": 2, "groundedness_pass_rate": 0.5, "latency_mean": 1.5},
+        "new": {"num_questions": 3, "relevance_pass_rate": 1.0},
+        "undated": {"num_questions": 1},
+    }
+    container = RunsContainerStub(
+        {f"runs/{run_id}/summary.json": json.dumps(summary).encode("utf-8") for run_id, summary in summaries.items()},
+        [
+            ListedBlob("runs/old/summary.json", datetime(2026, 1, 1, tzinfo=timezone.utc)),
+            ListedBlob("runs/old/eval_results.jsonl", datetime(2026, 1, 1, tzinfo=timezone.utc)),
+            ListedBlob("runs/undated/summary.json", None),
+            ListedBlob("runs/new/summary.json", datetime(2026, 2, 1, tzinfo=timezone.utc)),
+        ],
+    )
+
+    class BlobService:
+        def get_container_client(self, name: str) -> RunsContainerStub:
+            return container
+
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", lambda settings: BlobService())
+
+    response = await eval_runner.list_runs(build_run_request(""))
+
+    assert response.status_code == 200
+    runs = json.loads(response.get_body().decode("utf-8"))["runs"]
+    assert [(run["run_id"], run["timestamp"]) for run in runs] == [
+        ("new", "2026-02-01T00:00:00+00:00"),
+        ("old", "2026-01-01T00:00:00+00:00"),
+        ("undated", None),
+    ]
+    assert runs[1] == {
+        "run_id": "old",
+        "timestamp": "2026-01-01T00:00:00+00:00",
+        "num_questions": 2,
+        "groundedness_pass_rate": 0.5,
+        "relevance_pass_rate": None,
+        "citations_matched_rate": None,
+        "latency_mean": 1.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_eval_runner_list_runs_storage_error(
+    monkeypatch: pytest.MonkeyPatch, eval_runner_jobs: list[dict]
+) -> None:
+    def failing_client(settings):
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(eval_runner, "_get_blob_service_client", failing_client)
+
+    response = await eval_runner.list_runs(build_run_request(""))
+
+    assert response.status_code == 500
+    assert json.loads(response.get_body().decode("utf-8")) == {"error": "storage unavailable"}
@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("numpy")
+orjson = pytest.importorskip("orjson")
+
+from kg_archive import pack_knowledge_graph, unpack_knowledge_graph  # noqa: E402
+
+
+def _knowledge_graph() -> dict:
+    # Embedding values are exactly representable as float32, so the round trip is lossless
+    return {
+        "nodes": [
+            {
+                "id": "a",
+                "type": "document",
+                "properties": {
+                    "page_content": "[[a.pdf#page=1]]: first",
+                    "summary_embedding": [0.5, 0.25],
+                    "title_embedding": [1.0, -2.0, 0.125],
+                },
+            },
+            {
+                "id": "b",
+                "type": "document",
+                "properties": {"page_content": "[[b.pdf#page=1]]: second", "summary_embedding": None},
+            },
+            {
+                "id": "c",
+                "type": "chunk",
+                "properties": {"page_content": "third", "summary_embedding": [], "title_embedding": 3},
+            },
+            {
+                "id": "d",
+                "type": "chunk",
+                "properties": {"page_content": "fourth", "summary_embedding": [-1.5, 4.0]},
+            },
+        ],
+        "relationships": [{"source": "a", "target": "d", "type": "similar", "properties": {"score": 0.9}}],
+    }
+
+
+def test_pack_unpack_knowledge_graph_roundtrip():
+    original = _knowledge_graph()
+
+    restored = unpack_knowledge_graph(pack_knowledge_graph(orjson.dumps(original)))
+
+    assert restored == original
+
+
+def test_pack_knowledge_graph_keeps_values_it_does_not_replace():
+    """None, empty and non-list embedding properties are not mistaken for row indexes on unpack."""
+    restored = unpack_knowledge_graph(pack_knowledge_graph(orjson.dumps(_knowledge_graph())))
+
+    assert restored["nodes"][1]["properties"]["summary_embedding"] is None
+    assert restored["nodes"][2]["properties"]["summary_embedding"] == []
+    assert restored["nodes"][2]["properties"]["title_embedding"] == 3
+    assert restored["nodes"][3]["properties"]["summary_embedding"] == [-1.5, 4.0]
+
+
+def test_pack_knowledge_graph_without_embeddings():
+    original = {"nodes": [{"id": "a", "type": "document", "properties": {"page_content": "text"}}], "relationships": []}
+
+    assert unpack_knowledge_graph(pack_knowledge_graph(orjson.dumps(original))) == original
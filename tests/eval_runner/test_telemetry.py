@@ -0,0 +1,227 @@
+import atexit
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+pytest.importorskip("opencensus.ext.azure", reason="eval_runner telemetry needs opencensus-ext-azure")
+
+import telemetry  # noqa: E402
+from telemetry import EventBatcher  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def capture_events(caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO, logger="eval_runner.events")
+
+
+def emitted_payloads(caplog: pytest.LogCaptureFixture) -> list[str]:
+    """The serialized records dimension of every batch event emitted so far, in order."""
+    return [
+        record.custom_dimensions["records"]
+        for record in caplog.records
+        if record.name == "eval_runner.events" and "records" in record.custom_dimensions
+    ]
+
+
+def emitted_batches(caplog: pytest.LogCaptureFixture) -> list[list[dict]]:
+    return [json.loads(payload) for payload in emitted_payloads(caplog)]
+
+
+def test_event_batcher_flushes_at_max_records(caplog):
+    batcher = EventBatcher("TestBatch", max_records=2, max_interval_seconds=3600)
+
+    batcher.add({"n": 1})
+    assert emitted_batches(caplog) == []
+    batcher.add({"n": 2})
+    batcher.add({"n": 3})
+
+    assert emitted_batches(caplog) == [[{"n": 1}, {"n": 2}]]
+
+
+def test_event_batcher_flushes_after_interval(caplog):
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=0)
+
+    batcher.add({"n": 1})
+    batcher.add({"n": 2})
+
+    assert emitted_batches(caplog) == [[{"n": 1}], [{"n": 2}]]
+
+
+def test_event_batcher_flushes_before_exceeding_max_chars(caplog):
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=3600, max_chars=100)
+    record = {"text": "x" * 30}
+
+    for _ in range(3):
+        batcher.add(record)
+    batcher.flush()
+
+    assert emitted_batches(caplog) == [[record, record], [record]]
+
+
+def test_event_batcher_trims_records_whose_encoding_exceeds_max_chars(caplog):
+    """Quotes, newlines and backslashes escape to two chars each, so capped text can still encode too long."""
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=3600, max_chars=8000)
+    escaped = '"\n\\' * 500
+
+    record = {"run_id": "run-1", "question": escaped[:500], "truth": escaped, "answer": escaped, "context": escaped}
+    assert len(json.dumps(record, ensure_ascii=False)) > 8000
+
+    batcher.add(record)
+    batcher.flush()
+
+    (batch,) = emitted_batches(caplog)
+    (emitted,) = batch
+    assert len(emitted_payloads(caplog)[0]) <= 8000
+    assert emitted["run_id"] == "run-1"
+    assert escaped.startswith(emitted["answer"]) and escaped.startswith(emitted["context"])
+
+
+def test_event_batcher_trims_the_field_whose_encoding_overflows(caplog):
+    """Non-ASCII text encodes one char per char, but each control char encodes to six."""
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=3600, max_chars=8000)
+    record = {"run_id": "run-1", "truth": "é" * 1500, "context": "\x01" * 1500}
+    assert len(json.dumps(record, ensure_ascii=False)) > 8000
+
+    batcher.add(record)
+    batcher.flush()
+
+    (payload,) = emitted_payloads(caplog)
+    ((emitted,),) = emitted_batches(caplog)
+    assert 7900 < len(payload) <= 8000
+    assert emitted["truth"] == record["truth"]
+    assert 0 < len(emitted["context"]) < 1500
+
+
+def test_event_batcher_flush(caplog):
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=3600)
+
+    batcher.flush()
+    assert emitted_batches(caplog) == []
+
+    batcher.add({"n": 1})
+    batcher.flush()
+    batcher.flush()
+
+    assert emitted_batches(caplog) == [[{"n": 1}]]
+
+
+def test_emit_eval_question_result_batches_only_compact_fields(caplog, monkeypatch):
+    monkeypatch.setattr(
+        telemetry, "_question_result_batcher", EventBatcher("EvalQuestionResultBatch", max_interval_seconds=3600)
+    )
+
+    for i in range(50):
+        telemetry.emit_eval_question_result(
+            run_id="run-1",
+            question_index=i,
+            question="q" * 600,
+            truth="t" * 3000,
+            answer="a" * 3000,
+            context="c" * 3000,
+            groundedness=5,
+            relevance=4,
+            citations_matched=0.5,
+            any_citation=True,
+            latency=1.23456,
+            answer_length=3000,
+        )
+    telemetry.flush_eval_question_results()
+
+    question_events = [record for record in caplog.records if record.getMessage() == "EvalQuestionResult"]
+    assert [event.custom_dimensions["question_index"] for event in question_events] == list(range(50))
+    first = question_events[0].custom_dimensions
+    assert len(first["question"]) == 500
+    assert len(first["truth"]) == len(first["answer"]) == len(first["context"]) == 2000
+
+    batches = emitted_batches(caplog)
+    assert len(batches) <= 2
+    records = [record for batch in batches for record in batch]
+    assert [record["question_index"] for record in records] == list(range(50))
+    assert records[0] == {
+        "run_id": "run-1",
+        "question_index": 0,
+        "source": "generated",
+        "groundedness": 5,
+        "relevance": 4,
+        "citations_matched": 0.5,
+        "any_citation": True,
+        "latency": 1.235,
+        "answer_length": 3000,
+    }
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def test_event_listener_delivers_records_to_handler(monkeypatch):
+    exit_callbacks: list = []
+    monkeypatch.setattr(atexit, "register", exit_callbacks.append)
+    handler = RecordingHandler()
+    event_handlers = list(telemetry._event_logger.handlers)
+
+    listener = telemetry._start_event_listener(handler)
+    assert any(isinstance(h, QueueHandler) and h.queue is listener.queue for h in telemetry._event_logger.handlers)
+    try:
+        telemetry.emit_operation_started(operation="generate", details="num_questions=5")
+        # Stopping drains the queue, as the registered exit callback does at shutdown
+        (stop,) = exit_callbacks
+        assert stop == listener.stop
+        stop()
+    finally:
+        telemetry._event_logger.handlers = event_handlers
+
+    (record,) = handler.records
+    assert record.getMessage() == "OperationStarted"
+    assert record.custom_dimensions == {"operation": "generate", "details": "num_questions=5", "status": "started"}
+
+
+def test_event_batcher_keeps_oversized_record_without_text(caplog):
+    batcher = EventBatcher("TestBatch", max_records=50, max_interval_seconds=3600, max_chars=50)
+    record = {"scores": list(range(30))}
+
+    batcher.add(record)
+    batcher.flush()
+
+    assert emitted_batches(caplog) == [[record]]
+    assert "over the 48-char limit" in caplog.text
+
+
+def test_emit_operation_completed_caps_error(caplog):
+    telemetry.emit_operation_completed(operation="evaluate", status="error", duration_seconds=12.345, error="x" * 1500)
+
+    (event,) = [record for record in caplog.records if record.getMessage() == "OperationCompleted"]
+    assert event.custom_dimensions == {
+        "operation": "evaluate",
+        "status": "error",
+        "duration_seconds": 12.3,
+        "details": "",
+        "error": "x" * 1000,
+    }
+
+
+def test_emit_eval_run_completed(caplog):
+    metrics = {
+        "num_questions": 3,
+        "groundedness_pass_rate": 0.667,
+        "groundedness_mean": 4.0,
+        "relevance_pass_rate": 1.0,
+        "relevance_mean": 4.667,
+        "citations_matched_rate": 0.5,
+        "any_citation_rate": 1.0,
+        "latency_mean": 2.5,
+        "latency_max": 4.0,
+        "answer_length_mean": 321.0,
+    }
+
+    telemetry.emit_eval_run_completed(run_id="run-1", **metrics)
+
+    (event,) = [record for record in caplog.records if record.getMessage() == "EvalRunCompleted"]
+    assert event.custom_dimensions == {"run_id": "run-1", **metrics}
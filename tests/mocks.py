@@ -1,8 +1,10 @@
+import functools
 import json
 import os
 from collections import namedtuple
 from io import BytesIO
 from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
 
 import aiohttp
 import openai.types
@@ -82,6 +84,17 @@ class MockBlob:
         buffer.write(b"test")
 
 
+class MockParser:
+    """Parser whose parse() ignores its content and yields a fixed list of pages."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def parse(self, content):
+        for page in self.pages:
+            yield page
+
+
 class MockAiohttpClientResponse404(aiohttp.ClientResponse):
     def __init__(self, url, body_bytes, headers=None):
         self._body = body_bytes
@@ -684,3 +697,25 @@ def mock_speak_text_cancelled(self, text):
 
 def mock_speak_text_failed(self, text):
     return MockSynthesisResult(MockAudioFailure("mock_audio_data"))
+
+
+@functools.lru_cache(maxsize=32)
+def _canned_chat_response(content: str) -> MagicMock:
+    message = MagicMock()
+    message.content = content
+    choice = MagicMock()
+    choice.message = message
+    response = MagicMock()
+    response.choices = [choice]
+    return response
+
+
+def create_mock_summary_client(summary_text: str = "This is a summary of the document.") -> AsyncMock:
+    """Create a mock AsyncOpenAI client whose chat completions return summary_text.
+
+    The response object is shared between clients with the same summary_text; each
+    client gets its own create mock so call assertions stay per-test.
+    """
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(return_value=_canned_chat_response(summary_text))
+    return client
@@ -3,54 +3,71 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from prepdocslib.fileprocessor import FileProcessor
 from prepdocslib.filestrategy import (
     SUMMARY_INPUT_MAX_CHARS,
     SUMMARY_MAX_TOKENS,
     _generate_document_summary,
     parse_file,
 )
+from prepdocslib.listfilestrategy import File
 from prepdocslib.page import ImageOnPage, Page
 
+from .mocks import MockParser, create_mock_summary_client
 
-def _make_mock_openai_client(summary_text="This is a summary of the document."):
-    """Create a mock AsyncOpenAI client that returns a summary."""
-    mock_client = AsyncMock()
-    mock_message = MagicMock()
-    mock_message.content = summary_text
-    mock_choice = MagicMock()
-    mock_choice.message = mock_message
-    mock_response = MagicMock()
-    mock_response.choices = [mock_choice]
-    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
-    return mock_client
+# process_text is monkeypatched in the parse_file tests, so the splitter is never used
+_UNUSED_SPLITTER = MagicMock()
 
+FAKE_IMAGE_BYTES = b"fake_image"
+FAKE_IMAGE_BBOX = (0, 0, 100, 100)
 
-def _make_pages_with_images(texts, images_per_page=0):
-    """Create a list of Page objects with optional images."""
+
+# MockParser never reads its content, so one empty named buffer serves every test
+_UNUSED_CONTENT = BytesIO(b"")
+_UNUSED_CONTENT.name = "test.pdf"
+
+
+def _make_pdf_file():
+    """Create a File named test.pdf whose content is never read."""
+    return File(content=_UNUSED_CONTENT)
+
+
+def _make_text_pages(texts):
+    """Create a list of text-only Page objects with running offsets."""
     pages = []
     offset = 0
     for i, text in enumerate(texts):
-        page = Page(page_num=i, offset=offset, text=text)
-        for j in range(images_per_page):
-            image = ImageOnPage(
-                bytes=b"fake_image",
-                bbox=(0, 0, 100, 100),
-                page_num=i,
-                figure_id=f"fig_{i}_{j}",
-                filename=f"image_{i}_{j}.png",
-                placeholder=f'<figure id="fig_{i}_{j}"></figure>',
-            )
-            page.images.append(image)
-        pages.append(page)
+        pages.append(Page(page_num=i, offset=offset, text=text))
         offset += len(text)
     return pages
 
 
+def _make_pages_with_images(texts, images_per_page=0):
+    """Create a list of Page objects with optional images."""
+    pages = _make_text_pages(texts)
+    if images_per_page:
+        for page in pages:
+            i = page.page_num
+            for j in range(images_per_page):
+                figure_id = f"fig_{i}_{j}"
+                page.images.append(
+                    ImageOnPage(
+                        bytes=FAKE_IMAGE_BYTES,
+                        bbox=FAKE_IMAGE_BBOX,
+                        page_num=i,
+                        figure_id=figure_id,
+                        filename=f"image_{i}_{j}.png",
+                        placeholder=f'<figure id="{figure_id}"></figure>',
+                    )
+                )
+    return pages
+
+
 @pytest.mark.asyncio
 async def test_generate_summary_success():
     """Mock AsyncOpenAI client, verify summary is returned."""
-    pages = _make_pages_with_images(["Hello world, this is page one.", "Page two content here."])
-    client = _make_mock_openai_client("A document about greetings and content.")
+    pages = _make_text_pages(["Hello world, this is page one.", "Page two content here."])
+    client = create_mock_summary_client("A document about greetings and content.")
 
     result = await _generate_document_summary(pages, client, "gpt-4o-mini", "test.pdf")
 
@@ -69,7 +86,7 @@ async def test_generate_summary_success():
 @pytest.mark.asyncio
 async def test_generate_summary_failure_returns_none():
     """Mock client that raises, verify None returned."""
-    pages = _make_pages_with_images(["Some text here."])
+    pages = _make_text_pages(["Some text here."])
     client = AsyncMock()
     client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
 
@@ -81,7 +98,7 @@ async def test_generate_summary_failure_returns_none():
 @pytest.mark.asyncio
 async def test_generate_summary_empty_pages():
     """Empty pages list returns None."""
-    client = _make_mock_openai_client()
+    client = create_mock_summary_client()
 
     # Empty list
     result = await _generate_document_summary([], client, "gpt-4o-mini", "test.pdf")
@@ -92,8 +109,8 @@ async def test_generate_summary_empty_pages():
 @pytest.mark.asyncio
 async def test_generate_summary_whitespace_only_pages():
     """Pages with only whitespace text return None."""
-    pages = _make_pages_with_images(["   ", "\n", "\t"])
-    client = _make_mock_openai_client()
+    pages = _make_text_pages(["   ", "\n", "\t"])
+    client = create_mock_summary_client()
 
     result = await _generate_document_summary(pages, client, "gpt-4o-mini", "test.pdf")
 
@@ -102,45 +119,24 @@ async def test_generate_summary_whitespace_only_pages():
 
 
 @pytest.mark.asyncio
-async def test_summary_stamped_on_images(monkeypatch):
+async def test_summary_stamped_on_images(monkeypatch, mock_process_page_image):
     """After parse_file with summary client, images have source_document_summary."""
-    # Create mock file
-    mock_file = MagicMock()
-    mock_file.filename.return_value = "test.pdf"
-    mock_file.file_extension.return_value = ".pdf"
-    mock_file.content = BytesIO(b"test content")
+    # Create file
+    file = _make_pdf_file()
 
     # Create pages with images
     pages = _make_pages_with_images(["Page text about financial markets."], images_per_page=2)
 
-    # Create mock parser
-    mock_parser = MagicMock()
-
-    async def mock_parse(content):
-        for page in pages:
-            yield page
-
-    mock_parser.parse = mock_parse
-
-    mock_splitter = MagicMock()
-    mock_processor = MagicMock()
-    mock_processor.parser = mock_parser
-    mock_processor.splitter = mock_splitter
+    mock_processor = FileProcessor(parser=MockParser(pages), splitter=_UNUSED_SPLITTER)
 
     # Mock process_text
     monkeypatch.setattr("prepdocslib.filestrategy.process_text", lambda pages, file, splitter, category: [])
 
-    # Mock process_page_image
-    async def mock_process_page_image(**kwargs):
-        return kwargs["image"]
-
-    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", mock_process_page_image)
-
     # Create mock summary client
-    summary_client = _make_mock_openai_client("Financial markets overview document.")
+    summary_client = create_mock_summary_client("Financial markets overview document.")
 
     sections = await parse_file(
-        mock_file,
+        file,
         {".pdf": mock_processor},
         category=None,
         blob_manager=MagicMock(),
@@ -160,11 +156,12 @@ async def test_summary_stamped_on_images(monkeypatch):
 @pytest.mark.asyncio
 async def test_summary_text_truncation():
     """Verify only first SUMMARY_INPUT_MAX_CHARS chars are sent to the model."""
-    # Create pages with text that exceeds the limit
-    long_text = "A" * 2000
-    pages = _make_pages_with_images([long_text, long_text, long_text])
+    # Three pages of 2/3 of the limit each: the first is sent whole, the second is
+    # cut to the remaining third, and the third is never reached.
+    page_text = "A" * (SUMMARY_INPUT_MAX_CHARS * 2 // 3)
+    pages = _make_text_pages([page_text] * 3)
 
-    client = _make_mock_openai_client("Summary of a long document.")
+    client = create_mock_summary_client("Summary of a long document.")
 
     result = await _generate_document_summary(pages, client, "gpt-4o-mini", "test.pdf")
 
@@ -173,49 +170,29 @@ async def test_summary_text_truncation():
     # Verify the text sent to the model is truncated
     call_kwargs = client.chat.completions.create.call_args
     user_content = call_kwargs.kwargs["messages"][1]["content"]
-    # The total text should not exceed SUMMARY_INPUT_MAX_CHARS (3000)
-    # plus spaces used to join parts
-    # Page 1: 2000 chars, Page 2: 1000 chars (remaining), Page 3: skipped
+    # The total text should not exceed SUMMARY_INPUT_MAX_CHARS plus spaces used to join parts:
+    # page 1 is sent whole (two thirds of the limit), page 2 is cut to the remaining third
+    # and page 3 is skipped
     assert len(user_content) <= SUMMARY_INPUT_MAX_CHARS + 10  # small margin for join spaces
+    assert user_content.replace(" ", "") == "A" * SUMMARY_INPUT_MAX_CHARS
 
 
 @pytest.mark.asyncio
-async def test_parse_file_without_summary_client(monkeypatch):
+async def test_parse_file_without_summary_client(monkeypatch, mock_process_page_image):
     """parse_file with no summary_client -> images have None source_document_summary."""
-    # Create mock file
-    mock_file = MagicMock()
-    mock_file.filename.return_value = "test.pdf"
-    mock_file.file_extension.return_value = ".pdf"
-    mock_file.content = BytesIO(b"test content")
+    # Create file
+    file = _make_pdf_file()
 
     # Create pages with images
     pages = _make_pages_with_images(["Page text here."], images_per_page=1)
 
-    # Create mock parser
-    mock_parser = MagicMock()
-
-    async def mock_parse(content):
-        for page in pages:
-            yield page
-
-    mock_parser.parse = mock_parse
-
-    mock_splitter = MagicMock()
-    mock_processor = MagicMock()
-    mock_processor.parser = mock_parser
-    mock_processor.splitter = mock_splitter
+    mock_processor = FileProcessor(parser=MockParser(pages), splitter=_UNUSED_SPLITTER)
 
     # Mock process_text
     monkeypatch.setattr("prepdocslib.filestrategy.process_text", lambda pages, file, splitter, category: [])
 
-    # Mock process_page_image
-    async def mock_process_page_image(**kwargs):
-        return kwargs["image"]
-
-    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", mock_process_page_image)
-
     sections = await parse_file(
-        mock_file,
+        file,
         {".pdf": mock_processor},
         category=None,
         blob_manager=MagicMock(),
@@ -5,19 +5,22 @@ Section output, verifying that HybridPdfParser, text splitting, image
 extraction with context, and document summary generation all work together.
 """
 
-import io
+import itertools
 import pathlib
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import MagicMock
 
 import pytest
+import pytest_asyncio
 
 from prepdocslib.fileprocessor import FileProcessor
 from prepdocslib.filestrategy import parse_file
-from prepdocslib.listfilestrategy import File
 from prepdocslib.page import Page
 from prepdocslib.pdfparser import HYBRID_CONTEXT_TEXT_MAX_CHARS, HybridPdfParser, LocalPdfParser
 from prepdocslib.textsplitter import SentenceTextSplitter
 
+from .documents import collect_pages, iter_images, pdf_bytes, pdf_file
+from .mocks import create_mock_summary_client
+
 TEST_DATA_DIR = pathlib.Path(__file__).parent / "test-data"
 FINANCIAL_PDF = TEST_DATA_DIR / "Financial Market Analysis Report 2023.pdf"
 FIGURE_PDF = TEST_DATA_DIR / "Simple Figure.pdf"
@@ -28,63 +31,67 @@ FIGURE_PDF = TEST_DATA_DIR / "Simple Figure.pdf"
 # ---------------------------------------------------------------------------
 
 
-def _make_file_from_real_pdf(pdf_path: pathlib.Path) -> File:
-    """Create a File object backed by a real PDF on disk."""
-    with open(pdf_path, "rb") as f:
-        content = io.BytesIO(f.read())
-    content.name = pdf_path.name
-    return File(content=content)
+# The parsers, splitter and processors below hold no per-parse state, so one
+# instance of each is shared by every test in the session.
 
 
-def _make_mock_summary_client(summary_text: str = "A financial analysis report about market trends.") -> AsyncMock:
-    """Create a mock AsyncOpenAI client that returns a canned summary."""
-    mock_client = AsyncMock()
-    mock_message = MagicMock()
-    mock_message.content = summary_text
-    mock_choice = MagicMock()
-    mock_choice.message = mock_message
-    mock_response = MagicMock()
-    mock_response.choices = [mock_choice]
-    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
-    return mock_client
+@pytest.fixture(scope="session")
+def sentence_splitter() -> SentenceTextSplitter:
+    return SentenceTextSplitter()
 
 
-def _hybrid_file_processors() -> dict[str, FileProcessor]:
-    """Build file processors dict with HybridPdfParser for .pdf files."""
+@pytest.fixture(scope="session")
+def hybrid_processors(sentence_splitter) -> dict[str, FileProcessor]:
+    """File processors dict with HybridPdfParser for .pdf files."""
     return {
-        ".pdf": FileProcessor(HybridPdfParser(), SentenceTextSplitter()),
+        ".pdf": FileProcessor(HybridPdfParser(), sentence_splitter),
     }
 
 
-def _local_file_processors() -> dict[str, FileProcessor]:
-    """Build file processors dict with LocalPdfParser for .pdf files."""
+@pytest.fixture(scope="session")
+def local_processors(sentence_splitter) -> dict[str, FileProcessor]:
+    """File processors dict with LocalPdfParser for .pdf files."""
     return {
-        ".pdf": FileProcessor(LocalPdfParser(), SentenceTextSplitter()),
+        ".pdf": FileProcessor(LocalPdfParser(), sentence_splitter),
     }
 
 
+def _record_parsed_pages(monkeypatch, parser) -> list[Page]:
+    """Wrap parser.parse so the pages parse_file pulls from it can be checked without re-parsing."""
+    original_parse = parser.parse
+    pages: list[Page] = []
+
+    async def recording_parse(content):
+        async for page in original_parse(content):
+            pages.append(page)
+            yield page
+
+    monkeypatch.setattr(parser, "parse", recording_parse)
+    return pages
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def parsed_figure_pages(hybrid_processors) -> list[Page]:
+    """Pages of Simple Figure.pdf as parsed by HybridPdfParser, parsed once per session."""
+    return await collect_pages(hybrid_processors[".pdf"].parser, pdf_bytes(FIGURE_PDF), FIGURE_PDF.name)
+
+
 # ---------------------------------------------------------------------------
 # Test 1: Full pipeline test
 # ---------------------------------------------------------------------------
 
 
 @pytest.mark.asyncio
-async def test_hybrid_pdf_full_pipeline(monkeypatch):
+async def test_hybrid_pdf_full_pipeline(monkeypatch, hybrid_processors, mock_process_page_image):
     """Parse a real multi-page PDF through parse_file with HybridPdfParser
     and verify sections are returned with content."""
 
-    file = _make_file_from_real_pdf(FINANCIAL_PDF)
-    file_processors = _hybrid_file_processors()
-
-    # Mock process_page_image to avoid blob/network calls
-    async def mock_process_page_image(**kwargs):
-        return kwargs["image"]
-
-    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", mock_process_page_image)
+    file = pdf_file(FINANCIAL_PDF)
+    pages = _record_parsed_pages(monkeypatch, hybrid_processors[".pdf"].parser)
 
     sections = await parse_file(
         file,
-        file_processors,
+        hybrid_processors,
         category=None,
         blob_manager=None,
         image_embeddings_client=None,
@@ -98,10 +105,7 @@ async def test_hybrid_pdf_full_pipeline(monkeypatch):
     for i, section in enumerate(sections):
         assert section.chunk.text.strip(), f"Section {i} has empty text"
 
-    # Collect all pages produced by the parser to verify all pages have text
-    parser = file_processors[".pdf"].parser
-    file2 = _make_file_from_real_pdf(FINANCIAL_PDF)
-    pages: list[Page] = [page async for page in parser.parse(file2.content)]
+    # Verify all pages produced by the parser have text
     assert len(pages) > 0, "Expected pages from the PDF"
     for page in pages:
         assert len(page.text.strip()) > 0, f"Page {page.page_num} has no text"
@@ -113,19 +117,13 @@ async def test_hybrid_pdf_full_pipeline(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_hybrid_pdf_images_have_context():
+async def test_hybrid_pdf_images_have_context(parsed_figure_pages):
     """Parse Simple Figure.pdf through HybridPdfParser and verify
     extracted images have context_text populated."""
 
-    parser = HybridPdfParser()
-    file = _make_file_from_real_pdf(FIGURE_PDF)
-
-    pages: list[Page] = [page async for page in parser.parse(file.content)]
-    all_images = [img for page in pages for img in page.images]
-
-    assert len(all_images) > 0, "Expected at least one image from Simple Figure.pdf"
-
-    for img in all_images:
+    found_image = False
+    for img in iter_images(parsed_figure_pages):
+        found_image = True
         assert img.context_text is not None, f"Image {img.figure_id} has no context_text"
         assert len(img.context_text) > 0, f"Image {img.figure_id} has empty context_text"
         assert len(img.context_text) <= HYBRID_CONTEXT_TEXT_MAX_CHARS, (
@@ -133,6 +131,8 @@ async def test_hybrid_pdf_images_have_context():
             f"got {len(img.context_text)}"
         )
 
+    assert found_image, "Expected at least one image from Simple Figure.pdf"
+
 
 # ---------------------------------------------------------------------------
 # Test 3: DI routing test
@@ -156,9 +156,7 @@ async def test_hybrid_pdf_no_di_for_digital():
     mock_di_parser.parse = _spy_parse
 
     parser = HybridPdfParser(di_parser=mock_di_parser)
-    file = _make_file_from_real_pdf(FINANCIAL_PDF)
-
-    pages: list[Page] = [page async for page in parser.parse(file.content)]
+    pages = await collect_pages(parser, pdf_bytes(FINANCIAL_PDF), FINANCIAL_PDF.name)
 
     # DI should not have been invoked for a digital PDF
     assert not di_parse_called, "DI parser was called but PDF is fully digital"
@@ -175,26 +173,20 @@ async def test_hybrid_pdf_no_di_for_digital():
 
 
 @pytest.mark.asyncio
-async def test_summary_integration(monkeypatch):
+async def test_summary_integration(monkeypatch, hybrid_processors, mock_process_page_image):
     """Parse a PDF through parse_file with a mock summary client and verify
     that source_document_summary is stamped on images and the client was
     called with text from the document."""
 
     summary_text = "A financial analysis report about market trends."
-    mock_summary_client = _make_mock_summary_client(summary_text)
-
-    file = _make_file_from_real_pdf(FIGURE_PDF)
-    file_processors = _hybrid_file_processors()
+    mock_summary_client = create_mock_summary_client(summary_text)
 
-    # Mock process_page_image to avoid blob/network calls
-    async def mock_process_page_image(**kwargs):
-        return kwargs["image"]
-
-    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", mock_process_page_image)
+    file = pdf_file(FIGURE_PDF)
+    pages = _record_parsed_pages(monkeypatch, hybrid_processors[".pdf"].parser)
 
     sections = await parse_file(
         file,
-        file_processors,
+        hybrid_processors,
         category=None,
         blob_manager=None,
         image_embeddings_client=None,
@@ -212,19 +204,12 @@ async def test_summary_integration(monkeypatch):
     user_content = messages[1]["content"]
     assert len(user_content) > 0, "Expected non-empty text sent to summary model"
 
-    # Re-parse to check images have summary stamped
-    # (parse_file already stamps them; verify by re-parsing and manually checking)
-    parser = file_processors[".pdf"].parser
-    file2 = _make_file_from_real_pdf(FIGURE_PDF)
-    pages: list[Page] = [page async for page in parser.parse(file2.content)]
-    all_images = [img for page in pages for img in page.images]
-
-    if all_images:
+    # Check whether the parse that parse_file ran yielded images at all before checking their summary stamps
+    if any(page.images for page in pages):
         # The images from the original parse_file call should have been stamped.
         # We need to look at sections to confirm the stamps actually happened.
         # Since sections were built from the parsed pages, verify through sections.
-        images_in_sections = [img for section in sections for img in section.chunk.images]
-        for img in images_in_sections:
+        for img in itertools.chain.from_iterable(section.chunk.images for section in sections):
             assert img.source_document_summary == summary_text, (
                 f"Image {img.figure_id} missing summary stamp: got {img.source_document_summary!r}"
             )
@@ -236,21 +221,14 @@ async def test_summary_integration(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_parse_file_without_hybrid_parser(monkeypatch):
+async def test_parse_file_without_hybrid_parser(local_processors, mock_process_page_image):
     """Verify parse_file works normally with LocalPdfParser (no regression)."""
 
-    file = _make_file_from_real_pdf(FINANCIAL_PDF)
-    file_processors = _local_file_processors()
-
-    # Mock process_page_image to avoid blob/network calls
-    async def mock_process_page_image(**kwargs):
-        return kwargs["image"]
-
-    monkeypatch.setattr("prepdocslib.filestrategy.process_page_image", mock_process_page_image)
+    file = pdf_file(FINANCIAL_PDF)
 
     sections = await parse_file(
         file,
-        file_processors,
+        local_processors,
         category=None,
         blob_manager=None,
         image_embeddings_client=None,
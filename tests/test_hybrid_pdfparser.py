@@ -7,12 +7,13 @@ import pymupdf
 import pytest
 from PIL import Image
 
-from prepdocslib.page import Page
 from prepdocslib.pdfparser import (
     HYBRID_CONTEXT_TEXT_MAX_CHARS,
     HybridPdfParser,
 )
 
+from .documents import collect_pages, iter_images, pdf_bytes, pdf_file
+
 TEST_DATA_DIR = pathlib.Path(__file__).parent / "test-data"
 REAL_PDF = TEST_DATA_DIR / "Financial Market Analysis Report 2023.pdf"
 FIGURE_PDF = TEST_DATA_DIR / "Simple Figure.pdf"
@@ -23,10 +24,25 @@ FIGURE_PDF = TEST_DATA_DIR / "Simple Figure.pdf"
 # ---------------------------------------------------------------------------
 
 
-def _open_real_pdf_page(page_num: int = 0) -> tuple[pymupdf.Document, pymupdf.Page]:
-    """Open the real test PDF and return (doc, page)."""
-    doc = pymupdf.open(str(REAL_PDF))
-    return doc, doc.load_page(page_num)
+class _FakePage:
+    """Duck-typed stand-in for pymupdf.Page with just the members _page_needs_ocr reads."""
+
+    number = 0
+
+    def __init__(self, text: str, rect: pymupdf.Rect, images: list, rects_by_xref: dict):
+        self._text = text
+        self.rect = rect
+        self._images = images
+        self._rects_by_xref = rects_by_xref
+
+    def get_text(self, *args, **kwargs) -> str:
+        return self._text
+
+    def get_images(self, *args, **kwargs) -> list:
+        return self._images
+
+    def get_image_rects(self, xref) -> list:
+        return self._rects_by_xref.get(xref, [])
 
 
 def _make_mock_page(
@@ -34,20 +50,20 @@ def _make_mock_page(
     page_rect: pymupdf.Rect | None = None,
     images: list | None = None,
     image_rects_by_xref: dict | None = None,
-) -> MagicMock:
-    """Build a mock pymupdf.Page with controllable text, rect, images."""
-    mock_page = MagicMock(spec=pymupdf.Page)
-    mock_page.get_text.return_value = text
-    mock_page.rect = page_rect or pymupdf.Rect(0, 0, 612, 792)  # US Letter
-    mock_page.get_images.return_value = images or []
-
-    _rects_map = image_rects_by_xref or {}
+) -> _FakePage:
+    """Build a fake pymupdf.Page with controllable text, rect, images."""
+    return _FakePage(
+        text=text,
+        rect=page_rect or pymupdf.Rect(0, 0, 612, 792),  # US Letter
+        images=images or [],
+        rects_by_xref=image_rects_by_xref or {},
+    )
 
-    def _get_image_rects(xref):
-        return _rects_map.get(xref, [])
 
-    mock_page.get_image_rects = _get_image_rects
-    return mock_page
+@pytest.fixture(scope="session")
+def hybrid_parser() -> HybridPdfParser:
+    """A HybridPdfParser without DI; it holds no per-parse state, so one instance is shared."""
+    return HybridPdfParser()
 
 
 # ---------------------------------------------------------------------------
@@ -55,48 +71,26 @@ def _make_mock_page(
 # ---------------------------------------------------------------------------
 
 
-def test_page_needs_ocr_digital_page():
-    """A real PDF page with substantial text should be classified as digital."""
-    # Use page 1 (body page) which has more text than the title page
-    doc, page = _open_real_pdf_page(1)
-    try:
-        parser = HybridPdfParser()
-        assert parser._page_needs_ocr(page) is False
-    finally:
-        doc.close()
-
-
-def test_page_needs_ocr_scanned_signature():
-    """Mock page with no text and a large image covering most of the page -> scanned."""
-    page_rect = pymupdf.Rect(0, 0, 612, 792)
-    # Single large image covering > 50% of the page
-    big_img_rect = pymupdf.Rect(0, 0, 612, 600)  # ~75% coverage
-    mock_page = _make_mock_page(
-        text="",
-        page_rect=page_rect,
-        images=[(42, 0, 0, 0, 0, 0, 0, 0, "", "", 0)],  # xref=42
-        image_rects_by_xref={42: [big_img_rect]},
-    )
-
-    parser = HybridPdfParser()
-    assert parser._page_needs_ocr(mock_page) is True
-
-
-def test_page_needs_ocr_small_image_with_no_text():
-    """Mock page with minimal text and a tiny image -> True (too little text)."""
-    page_rect = pymupdf.Rect(0, 0, 612, 792)
-    # Small image (< 50% coverage)
-    small_img_rect = pymupdf.Rect(10, 10, 50, 50)
+@pytest.mark.parametrize(
+    "text, image_rect, expected",
+    [
+        ("lorem ipsum " * 200, None, False),  # Substantial text, no images -> digital
+        ("", pymupdf.Rect(0, 0, 612, 600), True),  # No text, image covers ~75% of the page -> scanned
+        ("Hi", pymupdf.Rect(10, 10, 50, 50), True),  # Small image, but too little text (heuristic 2) -> scanned
+    ],
+    ids=["digital_page", "scanned_signature", "small_image_with_no_text"],
+)
+def test_page_needs_ocr(hybrid_parser, text, image_rect, expected):
+    """_page_needs_ocr classifies fake US Letter pages by their text length and image coverage."""
+    xref = 42
     mock_page = _make_mock_page(
-        text="Hi",
-        page_rect=page_rect,
-        images=[(7, 0, 0, 0, 0, 0, 0, 0, "", "", 0)],  # xref=7
-        image_rects_by_xref={7: [small_img_rect]},
+        text=text,
+        page_rect=pymupdf.Rect(0, 0, 612, 792),
+        images=[(xref, 0, 0, 0, 0, 0, 0, 0, "", "", 0)] if image_rect else [],
+        image_rects_by_xref={xref: [image_rect]} if image_rect else {},
     )
 
-    parser = HybridPdfParser()
-    # Text length (2 chars) < HYBRID_OCR_MIN_TEXT_CHARS -> True via heuristic 2
-    assert parser._page_needs_ocr(mock_page) is True
+    assert hybrid_parser._page_needs_ocr(mock_page) is expected
 
 
 # ---------------------------------------------------------------------------
@@ -105,14 +99,9 @@ def test_page_needs_ocr_small_image_with_no_text():
 
 
 @pytest.mark.asyncio
-async def test_hybrid_parser_digital_pdf():
+async def test_hybrid_parser_digital_pdf(hybrid_parser):
     """Parsing a real digital PDF should produce pages with non-empty text."""
-    parser = HybridPdfParser()
-    with open(REAL_PDF, "rb") as f:
-        content = io.BytesIO(f.read())
-        content.name = "Financial Market Analysis Report 2023.pdf"
-
-    pages: list[Page] = [page async for page in parser.parse(content)]
+    pages = await collect_pages(hybrid_parser, pdf_bytes(REAL_PDF), REAL_PDF.name)
 
     assert len(pages) > 0
     # Every page should have some text
@@ -124,57 +113,50 @@ async def test_hybrid_parser_digital_pdf():
 
 
 @pytest.mark.asyncio
-async def test_hybrid_parser_extracts_images():
+async def test_hybrid_parser_extracts_images(hybrid_parser):
     """The parser should extract images from a PDF that contains embedded raster images."""
-    parser = HybridPdfParser()
-    with open(FIGURE_PDF, "rb") as f:
-        content = io.BytesIO(f.read())
-        content.name = "Simple Figure.pdf"
-
-    pages: list[Page] = [page async for page in parser.parse(content)]
-    all_images = [img for page in pages for img in page.images]
+    pages = await collect_pages(hybrid_parser, pdf_bytes(FIGURE_PDF), FIGURE_PDF.name)
 
-    # Simple Figure.pdf contains one embedded JPEG image
-    assert len(all_images) > 0
-
-    for img in all_images:
+    found_image = False
+    for img in iter_images(pages):
+        found_image = True
         assert img.figure_id.startswith("img_")
         assert len(img.bytes) > 0
         assert img.placeholder.startswith("<figure")
         assert img.mime_type.startswith("image/")
 
+    # Simple Figure.pdf contains one embedded JPEG image
+    assert found_image
+
 
 @pytest.mark.asyncio
-async def test_hybrid_parser_populates_context_text():
+async def test_hybrid_parser_populates_context_text(hybrid_parser):
     """Extracted images should have non-empty context_text from the source page."""
-    parser = HybridPdfParser()
-    with open(FIGURE_PDF, "rb") as f:
-        content = io.BytesIO(f.read())
-        content.name = "Simple Figure.pdf"
-
-    pages: list[Page] = [page async for page in parser.parse(content)]
-    all_images = [img for page in pages for img in page.images]
+    pages = await collect_pages(hybrid_parser, pdf_bytes(FIGURE_PDF), FIGURE_PDF.name)
 
-    assert len(all_images) > 0
-    for img in all_images:
+    found_image = False
+    for img in iter_images(pages):
+        found_image = True
         assert img.context_text is not None
         assert len(img.context_text) > 0
         assert len(img.context_text) <= HYBRID_CONTEXT_TEXT_MAX_CHARS
+    assert found_image
 
 
 @pytest.mark.asyncio
-async def test_hybrid_parser_logs_page_routing(caplog):
+async def test_hybrid_parser_logs_page_routing(hybrid_parser, monkeypatch):
     """Log output should contain the local/DI page routing summary."""
-    parser = HybridPdfParser()
-    with open(REAL_PDF, "rb") as f:
-        content = io.BytesIO(f.read())
-        content.name = "Financial Market Analysis Report 2023.pdf"
+    # Spy on logger.info directly; messages are only formatted when asserting
+    info_calls: list[tuple] = []
+    monkeypatch.setattr(
+        "prepdocslib.pdfparser.logger.info", lambda msg, *args, **kwargs: info_calls.append((msg, args))
+    )
 
-    with caplog.at_level(logging.INFO, logger="scripts"):
-        _ = [page async for page in parser.parse(content)]
+    await collect_pages(hybrid_parser, pdf_bytes(REAL_PDF), REAL_PDF.name)
 
-    assert any("pages local" in record.message for record in caplog.records), (
-        f"Expected 'pages local' in log output, got: {[r.message for r in caplog.records]}"
+    messages = [msg % args if args else msg for msg, args in info_calls]
+    assert any("pages local" in message for message in messages), (
+        f"Expected 'pages local' in log output, got: {messages}"
     )
 
 
@@ -194,15 +176,17 @@ async def test_hybrid_parser_sends_only_scanned_pages_to_di():
     mock_di_parser.parse = _spy_parse
 
     parser = HybridPdfParser(di_parser=mock_di_parser)
-    with open(REAL_PDF, "rb") as f:
-        content = io.BytesIO(f.read())
-        content.name = "Financial Market Analysis Report 2023.pdf"
+    content = pdf_file(REAL_PDF).content
 
-    pages: list[Page] = [page async for page in parser.parse(content)]
+    # Pages are only yielded after every page has been routed (and DI called, if
+    # needed), so the first page is enough to observe the routing decision.
+    pages = parser.parse(content)
+    first_page = await anext(pages, None)
+    await pages.aclose()
 
     # The real PDF is digital, so DI should not have been invoked
     assert not di_parse_called, "DI parser was called but PDF is fully digital"
-    assert len(pages) > 0
+    assert first_page is not None
 
 
 @pytest.mark.asyncio
@@ -219,16 +203,11 @@ async def test_hybrid_parser_scanned_pages_no_di_yields_empty_pages(caplog):
     img.save(img_bytes, format="PNG")
     img_bytes.seek(0)
     page.insert_image(pymupdf.Rect(6, 6, 606, 786), stream=img_bytes.getvalue())
-    pdf_bytes = doc.tobytes()
+    scanned_bytes = doc.tobytes()
     doc.close()
 
-    content = io.BytesIO(pdf_bytes)
-    content.name = "scanned_test.pdf"
-
-    import logging
-
     with caplog.at_level(logging.WARNING, logger="scripts"):
-        pages = [p async for p in parser.parse(content)]
+        pages = await collect_pages(parser, scanned_bytes, "scanned_test.pdf")
 
     # Should still yield a page (empty text) rather than dropping it
     assert len(pages) == 1
@@ -1,10 +1,9 @@
 """Tests for Office image extraction with context fields (PPTX & DOCX)."""
 
+import functools
 import io
 
 import pytest
-from PIL import Image
-from pptx import Presentation
 from pptx.util import Inches
 
 from prepdocslib.officeimageextractor import (
@@ -14,23 +13,11 @@ from prepdocslib.officeimageextractor import (
 )
 from prepdocslib.page import Page
 
+from .documents import build_pptx, large_test_image, new_presentation
 
-def _make_large_test_png() -> bytes:
-    """Create a noisy PNG that is guaranteed to pass the 2 KB byte-size filter.
-
-    Solid-color PNGs compress to ~300-600 bytes, which is below the 2048-byte
-    minimum threshold.  A random-noise image compresses much larger.
-    """
-    import random
-
-    rng = random.Random(42)  # deterministic for reproducibility
-    pixels = bytes([rng.randint(0, 255) for _ in range(200 * 200 * 3)])
-    img = Image.frombytes("RGB", (200, 200), pixels)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    data = buf.getvalue()
-    assert len(data) >= 2048, f"Test image only {len(data)} bytes — too small for filters"
-    return data
+# Over-long context text for the truncation tests; only the length matters.
+_LONG_A = "A" * (_CONTEXT_TEXT_MAX_CHARS + 500)
+_LONG_B = "B" * (_CONTEXT_TEXT_MAX_CHARS + 500)
 
 
 def _build_pptx_bytes(
@@ -39,41 +26,18 @@ def _build_pptx_bytes(
     include_picture: bool = True,
 ) -> bytes:
     """Build a minimal PPTX in memory with one slide."""
-    prs = Presentation()
-    slide_layout = prs.slide_layouts[1]  # Layout with title and content
-    slide = prs.slides.add_slide(slide_layout)
-
-    if title_text is not None and slide.shapes.title is not None:
-        slide.shapes.title.text = title_text
-
-    # Add a text box
-    from pptx.util import Emu
-
-    left = Inches(1)
-    top = Inches(2)
-    width = Inches(4)
-    height = Inches(1)
-    txBox = slide.shapes.add_textbox(left, top, width, height)
-    txBox.text_frame.text = body_text
-
-    if include_picture:
-        img_bytes = _make_large_test_png()
-        img_stream = io.BytesIO(img_bytes)
-        slide.shapes.add_picture(img_stream, Inches(1), Inches(3), Inches(2), Inches(2))
-
-    buf = io.BytesIO()
-    prs.save(buf)
-    return buf.getvalue()
+    return build_pptx([{"title": title_text, "body": body_text, "include_picture": include_picture}])
 
 
+@functools.cache
 def _build_pptx_no_title_bytes() -> bytes:
     """Build a PPTX with a blank slide layout (no title placeholder)."""
-    prs = Presentation()
+    prs = new_presentation()
     slide_layout = prs.slide_layouts[6]  # Blank layout - no title
     slide = prs.slides.add_slide(slide_layout)
 
     # Add only a picture, no title shape
-    img_bytes = _make_large_test_png()
+    img_bytes = large_test_image()
     img_stream = io.BytesIO(img_bytes)
     slide.shapes.add_picture(img_stream, Inches(1), Inches(1), Inches(2), Inches(2))
 
@@ -82,6 +46,7 @@ def _build_pptx_no_title_bytes() -> bytes:
     return buf.getvalue()
 
 
+@functools.cache
 def _build_docx_bytes(
     heading_text: str = "Section Header",
     body_text: str = "Some paragraph text under the heading.",
@@ -96,7 +61,7 @@ def _build_docx_bytes(
     doc.add_paragraph(body_text)
 
     if include_image:
-        img_bytes = _make_large_test_png()
+        img_bytes = large_test_image()
         img_stream = io.BytesIO(img_bytes)
         doc.add_picture(img_stream, DocxInches(2))
 
@@ -110,11 +75,16 @@ def _build_docx_bytes(
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def pptx_images():
+    """Images extracted once from a titled slide with body text, shared by the tests that only read them."""
+    return _extract_pptx_images(_build_pptx_bytes(title_text="Test Title", body_text="Some body text"), "slides.pptx")
+
+
 class TestPptxContextFields:
-    def test_pptx_context_fields(self):
+    def test_pptx_context_fields(self, pptx_images):
         """Images extracted from PPTX have slide title and context text."""
-        pptx_bytes = _build_pptx_bytes(title_text="Test Title", body_text="Some body text")
-        images = _extract_pptx_images(pptx_bytes, "slides.pptx")
+        images = pptx_images
 
         assert len(images) >= 1
         img = images[0]
@@ -131,16 +101,15 @@ class TestPptxContextFields:
         img = images[0]
         assert img.context_title is None
 
-    def test_pptx_context_text_includes_title(self):
+    def test_pptx_context_text_includes_title(self, pptx_images):
         """The context_text includes the title text (since it is a text shape on the slide)."""
-        pptx_bytes = _build_pptx_bytes(title_text="Slide Title", body_text="Body content here")
-        images = _extract_pptx_images(pptx_bytes, "slides.pptx")
+        images = pptx_images
 
         assert len(images) >= 1
         # The title shape is also a text shape, so context_text should include it
         assert images[0].context_text is not None
-        assert "Slide Title" in images[0].context_text
-        assert "Body content here" in images[0].context_text
+        assert "Test Title" in images[0].context_text
+        assert "Some body text" in images[0].context_text
 
 
 # ---------------------------------------------------------------------------
@@ -181,7 +150,7 @@ class TestDocxContextFields:
 
         doc = Document()
         doc.add_paragraph("Just a plain paragraph, no heading.")
-        img_bytes = _make_large_test_png()
+        img_bytes = large_test_image()
         doc.add_picture(io.BytesIO(img_bytes), DocxInches(2))
 
         buf = io.BytesIO()
@@ -203,8 +172,7 @@ class TestDocxContextFields:
 class TestContextTextTruncation:
     def test_context_text_truncation_pptx(self):
         """context_text is truncated to _CONTEXT_TEXT_MAX_CHARS for PPTX."""
-        long_text = "A" * (_CONTEXT_TEXT_MAX_CHARS + 500)
-        pptx_bytes = _build_pptx_bytes(title_text="Title", body_text=long_text)
+        pptx_bytes = _build_pptx_bytes(title_text="Title", body_text=_LONG_A)
         images = _extract_pptx_images(pptx_bytes, "slides.pptx")
 
         assert len(images) >= 1
@@ -213,10 +181,10 @@ class TestContextTextTruncation:
 
     def test_context_text_truncation_docx(self):
         """context_text is truncated to _CONTEXT_TEXT_MAX_CHARS for DOCX."""
-        long_page_text = "B" * (_CONTEXT_TEXT_MAX_CHARS + 500)
-        docx_bytes = _build_docx_bytes(heading_text="H", body_text="text")
+        # The long text comes from the pages, so reuse the document built for test_docx_context_fields
+        docx_bytes = _build_docx_bytes(heading_text="Section Header", body_text="Body text.")
 
-        pages = [Page(page_num=0, offset=0, text=long_page_text)]
+        pages = [Page(page_num=0, offset=0, text=_LONG_B)]
         images = _extract_docx_images(docx_bytes, "document.docx", pages)
 
         assert len(images) >= 1
@@ -1,20 +1,21 @@
 import base64
+import dataclasses
 
 from prepdocslib.page import ImageOnPage
 
+_TEMPLATE_IMAGE = ImageOnPage(
+    bytes=b"fake-image-bytes",
+    bbox=(0, 0, 100, 100),
+    filename="slide_1.png",
+    figure_id="fig_1",
+    page_num=0,
+    placeholder='<figure id="fig_1"></figure>',
+)
+
 
 def _make_image(**kwargs) -> ImageOnPage:
     """Helper to create an ImageOnPage with sensible defaults, overridden by kwargs."""
-    defaults = {
-        "bytes": b"fake-image-bytes",
-        "bbox": (0, 0, 100, 100),
-        "filename": "slide_1.png",
-        "figure_id": "fig_1",
-        "page_num": 0,
-        "placeholder": '<figure id="fig_1"></figure>',
-    }
-    defaults.update(kwargs)
-    return ImageOnPage(**defaults)
+    return dataclasses.replace(_TEMPLATE_IMAGE, **kwargs)
 
 
 class TestImageOnPageContextFields: